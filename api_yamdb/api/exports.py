@@ -0,0 +1,59 @@
+"""Потоковая выгрузка таблиц в NDJSON.
+
+Строки выбираются порциями по EXPORT_CHUNK_SIZE с условием id > последний
+выгруженный id, а не через OFFSET, и сразу отдаются клиенту, поэтому
+память и время одного запроса не зависят от размера таблицы.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from reviews.models import Comment, Review, Title
+
+from .readers import COMMENT_EXPORT_PLAN, REVIEW_EXPORT_PLAN, TITLE_EXPORT_PLAN
+from .renderers import NDJSONRenderer
+
+
+class Export:
+    """Выгружаемая таблица: queryset, план чтения и поле для ?since=."""
+
+    def __init__(self, queryset, plan, since_field=None):
+        self.queryset = queryset
+        self.plan = plan
+        self.since_field = since_field
+
+    def get_queryset(self, since=None):
+        queryset = self.queryset.all()
+        if since is None:
+            return queryset
+        if self.since_field is None:
+            raise ValidationError({
+                'since': 'Эта выгрузка не поддерживает фильтр по времени.'
+            })
+        try:
+            since = serializers.DateTimeField().run_validation(since)
+        except ValidationError as exc:
+            raise ValidationError({'since': exc.detail})
+        return queryset.filter(**{f'{self.since_field}__gte': since})
+
+    def iter_chunks(self, queryset, chunk_size=None):
+        """Байты NDJSON, по порции строк на элемент."""
+        chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+        renderer = NDJSONRenderer()
+        rows = self.plan.values(queryset.order_by('id'))
+        last_id = None
+        while True:
+            chunk = rows if last_id is None else rows.filter(id__gt=last_id)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return
+            yield renderer.render_lines(self.plan.render(chunk))
+            last_id = chunk[-1]['id']
+
+
+EXPORTS = {
+    'titles': Export(Title.objects.all(), TITLE_EXPORT_PLAN, 'updated_at'),
+    'reviews': Export(Review.objects.all(), REVIEW_EXPORT_PLAN, 'pub_date'),
+    'comments': Export(
+        Comment.objects.all(), COMMENT_EXPORT_PLAN, 'pub_date'
+    ),
+}
@@ -1,12 +1,77 @@
 import django_filters
-from reviews.models import Title
+from django.db.models import Exists, OuterRef
+from reviews import search
+from reviews.models import Categories, Genre, GenreTitle, Title
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Список строк через запятую: ?genre=drama,comedy."""
+
+
+class FullTextSearchFilter(SearchFilter):
+    """Параметр search= по полнотекстовому индексу FTS5.
+
+    Результаты упорядочены по релевантности. На базах без FTS5
+    работает как обычный SearchFilter по search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not search.is_available():
+            return super().filter_queryset(request, queryset, view)
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search.full_text_search(queryset, ' '.join(terms))
+
+
+class IdTiebreakOrderingFilter(OrderingFilter):
+    """OrderingFilter, который добавляет -id последним ключом сортировки.
+
+    Записи с равными значениями (например, одинаковым числом отзывов)
+    идут в одном и том же порядке на всех страницах, а сортировка
+    использует составные индексы (..., -id).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id'} & set(ordering):
+            ordering = [*ordering, '-id']
+        return ordering
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для произведений."""
-    genre = django_filters.CharFilter(field_name='genre__slug')
-    category = django_filters.CharFilter(field_name='category__slug')
+    """Фильтр для произведений.
+
+    Жанры и категории проверяются подзапросами EXISTS/IN, без JOIN
+    к списку произведений, поэтому произведения не дублируются.
+    """
+    genre = CharInFilter(method='filter_genre_any')
+    genre_all = CharInFilter(method='filter_genre_all')
+    category = CharInFilter(method='filter_category')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'genre_all', 'name', 'year')
+
+    @staticmethod
+    def genre_exists(slugs):
+        return Exists(GenreTitle.objects.filter(
+            title=OuterRef('pk'),
+            genre__in=Genre.objects.filter(slug__in=slugs),
+        ))
+
+    def filter_genre_any(self, queryset, name, value):
+        """Произведения хотя бы с одним из перечисленных жанров."""
+        return queryset.filter(self.genre_exists(value))
+
+    def filter_genre_all(self, queryset, name, value):
+        """Произведения со всеми перечисленными жанрами."""
+        for slug in set(value):
+            queryset = queryset.filter(self.genre_exists([slug]))
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__in=Categories.objects.filter(slug__in=value)
+        )
@@ -0,0 +1,303 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from reviews.generations import get_generations, get_modified
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_BUDGET = {
+    # Префикс путей, для которых считаются запросы.
+    'PATH_PREFIX': '/api/',
+    # Бюджет GET-запросов по умолчанию; None - без ограничения.
+    'DEFAULT': None,
+    # Бюджеты по имени маршрута, например {'api:titles-list': 3}.
+    'ROUTES': {},
+    # Что делать при превышении: 'log', 'header' или 'raise'.
+    'ACTION': 'log',
+    # Сколько одинаковых запросов считать признаком N+1.
+    'N_PLUS_ONE_THRESHOLD': 3,
+}
+
+DEFAULT_RESPONSE_CACHE = {
+    # Сколько секунд хранится ответ.
+    'TIMEOUT': 300,
+    # Модели, от поколений которых зависит ответ, по имени маршрута без
+    # суффикса действия, например {'api:genres': ('reviews.Genre',)}.
+    # Ответы этих маршрутов кэшируются и отдаются с ETag и Last-Modified.
+    'ROUTES': {},
+}
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Приводит SQL к шаблону: литералы и списки параметров заменены на ?."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def get_query_budget_settings():
+    return {**DEFAULT_QUERY_BUDGET, **getattr(settings, 'QUERY_BUDGET', {})}
+
+
+class QueryRecorder:
+    """Обёртка для connection.execute_wrapper, запоминающая все запросы."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """Шаблоны запросов, выполненные не меньше threshold раз."""
+        counts = Counter(fingerprint(sql) for sql in self.queries)
+        return {
+            pattern: count for pattern, count in counts.items()
+            if count >= threshold
+        }
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы при обработке запросов к API и проверяет бюджет.
+
+    Подключается переменной окружения QUERY_BUDGET=true, настройки
+    задаются словарём QUERY_BUDGET в settings.py.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_query_budget_settings()
+        if not request.path.startswith(config['PATH_PREFIX']):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        route = getattr(request.resolver_match, 'view_name', None)
+        budget = None
+        if request.method in ('GET', 'HEAD'):
+            budget = config['ROUTES'].get(route, config['DEFAULT'])
+        count = len(recorder.queries)
+        repeated = recorder.repeated(config['N_PLUS_ONE_THRESHOLD'])
+        over_budget = budget is not None and count > budget
+
+        if over_budget or repeated:
+            logger.warning(
+                '%s %s (%s): %d SQL-запросов при бюджете %s; '
+                'повторяющиеся запросы: %s',
+                request.method, request.path, route, count, budget,
+                repeated or 'нет',
+            )
+        if config['ACTION'] == 'header':
+            response['X-Query-Count'] = str(count)
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+            if repeated:
+                response['X-Query-N-Plus-One'] = str(len(repeated))
+        elif (
+            config['ACTION'] == 'raise' and settings.DEBUG
+            and (over_budget or repeated)
+        ):
+            return JsonResponse({
+                'detail': 'Превышен бюджет SQL-запросов.',
+                'route': route,
+                'count': count,
+                'budget': budget,
+                'repeated': repeated,
+            }, status=500)
+        return response
+
+
+def get_response_cache_settings():
+    return {
+        **DEFAULT_RESPONSE_CACHE, **getattr(settings, 'RESPONSE_CACHE', {})
+    }
+
+
+# Счётчики попаданий и промахов кэша ответов этого процесса: запись в
+# общее хранилище на каждый запрос стоила бы дороже самого попадания.
+response_cache_counts = Counter()
+response_cache_counts_lock = threading.Lock()
+
+
+def response_cache_stats():
+    """Количество попаданий и промахов кэша ответов в этом процессе."""
+    with response_cache_counts_lock:
+        return {
+            outcome: response_cache_counts[outcome]
+            for outcome in ('hits', 'misses')
+        }
+
+
+def reset_response_cache_stats():
+    with response_cache_counts_lock:
+        response_cache_counts.clear()
+
+
+def count_response_cache(outcome):
+    with response_cache_counts_lock:
+        response_cache_counts[outcome] += 1
+
+
+def get_route_models(request):
+    """Модели, от которых зависит ответ на GET- или HEAD-запрос, или None,
+    если маршрута нет в RESPONSE_CACHE['ROUTES']."""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    try:
+        view_name = resolve(request.path_info).view_name
+    except Resolver404:
+        return None
+    routes = get_response_cache_settings()['ROUTES']
+    labels = routes.get(view_name.rsplit('-', 1)[0])
+    if labels is None:
+        return None
+    return [apps.get_model(label) for label in labels]
+
+
+def representation_digest(request, models, *extra):
+    """Хэш адреса с упорядоченными параметрами, заголовка Accept, extra и
+    поколений моделей: меняется при любой записи, влияющей на ответ."""
+    # Адрес с хостом: ссылки next и previous в ответе абсолютные.
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return hashlib.md5(repr((
+        request.build_absolute_uri(request.path),
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        extra,
+        get_generations(models, request),
+    )).encode()).hexdigest()
+
+
+class ConditionalGetMiddleware:
+    """Отвечает 304 на условные GET-запросы, не вызывая представление.
+
+    Для маршрутов из RESPONSE_CACHE['ROUTES'] строгий ETag - хэш запроса
+    и поколений моделей маршрута, Last-Modified - время последней записи
+    в эти модели. Оба значения хранятся в базе (reviews.ModelGeneration),
+    одинаковы во всех процессах и читаются одним запросом без рендеринга
+    ответа, поэтому If-None-Match и If-Modified-Since проверяются до
+    сериализации.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        models = get_route_models(request)
+        if models is None:
+            return self.get_response(request)
+
+        # Токен входит в ETag: просматриваемый API показывает разным
+        # пользователям разные формы.
+        etag = quote_etag(representation_digest(
+            request, models, request.META.get('HTTP_AUTHORIZATION', '')
+        ))
+        last_modified = get_modified(models, request)
+        if time.time() - last_modified < 1:
+            # Last-Modified точен до секунды: следующая запись в ту же
+            # секунду его не изменит, поэтому его пока не отдаём.
+            last_modified = None
+        else:
+            last_modified = int(last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_response(request)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class AnonymousResponseCacheMiddleware:
+    """Кэширует ответы на GET- и HEAD-запросы без токена.
+
+    Кэшируются только маршруты из RESPONSE_CACHE['ROUTES'] в settings.py.
+    Ключ состоит из метода, адреса с упорядоченными параметрами запроса,
+    заголовка Accept и поколений моделей маршрута, которые читаются до
+    обработки запроса. Запись в эти модели через ORM меняет поколение
+    после фиксации транзакции, и прежние ответы больше не используются.
+    Изменения в обход сигналов (update(), bulk-операции, SQL) поколения
+    не меняют: такие ответы живут до RESPONSE_CACHE['TIMEOUT'].
+
+    Поколения хранятся в базе, поэтому ключи одинаковы во всех процессах
+    и кэш может быть как локальным для процесса, так и общим (Memcached):
+    запись, обработанная одним процессом, меняет ключи во всех. Попадание
+    стоит одного запроса к базе - чтения поколений. Заголовок X-Cache
+    показывает HIT или MISS, счётчики процесса доступны через
+    response_cache_stats().
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        models = None
+        if 'HTTP_AUTHORIZATION' not in request.META:
+            models = get_route_models(request)
+        if models is None:
+            return self.get_response(request)
+
+        key = 'response:' + representation_digest(
+            request, models, request.method
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            count_response_cache('hits')
+            status, content, headers = cached
+            response = HttpResponse(content, status=status)
+            for header, value in headers:
+                response[header] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        count_response_cache('misses')
+        response = self.get_response(request)
+        if self.is_cacheable(response):
+            cache.set(
+                key,
+                (response.status_code, response.content,
+                 list(response.items())),
+                get_response_cache_settings()['TIMEOUT'],
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @staticmethod
+    def is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        )
@@ -0,0 +1,188 @@
+import hashlib
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from reviews.generations import get_generations
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from .filters import FullTextSearchFilter
+
+
+class IdCursorPagination(CursorPagination):
+    """Постраничный вывод по курсору: WHERE id < последний id, без OFFSET.
+
+    Порядок задаётся атрибутом cursor_ordering представления, по умолчанию
+    '-id'. Поле уникально, поэтому записи, добавленные между запросами
+    страниц, не сдвигают и не дублируют уже выданные результаты.
+    """
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        return (getattr(view, 'cursor_ordering', self.ordering),)
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """Номера страниц по умолчанию, курсор - если передан параметр cursor.
+
+    Пустой ?cursor= возвращает первую страницу. В режиме курсора ответ
+    не содержит count, и общее количество записей не считается. Курсор
+    задаёт свой порядок записей, поэтому параметры фильтров, меняющих
+    порядок (ordering= и search= с сортировкой по релевантности), вместе
+    с ним отклоняются с ошибкой 400.
+    """
+    cursor_query_param = IdCursorPagination.cursor_query_param
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.check_cursor_order(request, view)
+            self.cursor_paginator = IdCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def check_cursor_order(self, request, view):
+        for param in self.get_reordering_params(view):
+            if request.query_params.get(param):
+                raise ValidationError({param: (
+                    f'Нельзя сочетать с параметром {self.cursor_query_param}: '
+                    'страницы по курсору упорядочены по id.'
+                )})
+
+    @staticmethod
+    def get_reordering_params(view):
+        """Параметры фильтров представления, меняющих порядок записей."""
+        params = []
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                params.append(backend.ordering_param)
+            elif issubclass(backend, FullTextSearchFilter):
+                params.append(backend.search_param)
+        return params
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            super().get_schema_operation_parameters(view)
+            + IdCursorPagination().get_schema_operation_parameters(view)
+        )
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+def count_cache_key(queryset, generations):
+    """Ключ кэша количества: SQL запроса и поколения моделей."""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(
+        repr((sql, params, generations)).encode()
+    ).hexdigest()
+    return f'count:{digest}'
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт количество записей из кэша.
+
+    Посчитанное значение хранится COUNT_CACHE_TTL секунд под ключом с
+    поколениями моделей (count_generations - функция, возвращающая их).
+    Поколения хранятся в базе, поэтому запись через ORM в любом процессе
+    сбрасывает значение при фиксации транзакции. Записи в обход сигналов
+    (update(), bulk-операции, SQL) учитываются не позже чем через TTL,
+    поэтому значение из кэша помечается как приблизительное.
+
+    Если задан known_count и он возвращает число (например, счётчик
+    отзывов произведения), при промахе кэша COUNT(*) не выполняется.
+    """
+
+    def __init__(self, object_list, per_page, count_generations=tuple,
+                 exact=False, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_generations = count_generations
+        self.exact = exact
+        self.known_count = known_count
+        self.count_approximate = False
+
+    @cached_property
+    def count(self):
+        key = count_cache_key(self.object_list, self.count_generations())
+        if not self.exact:
+            count = cache.get(key)
+            if count is not None:
+                self.count_approximate = True
+                return count
+        count = self.known_count and self.known_count()
+        if count is None:
+            count = Paginator.count.func(self)
+        cache.set(key, count, settings.COUNT_CACHE_TTL)
+        return count
+
+
+class ApproximateCountPagination(PageNumberOrCursorPagination):
+    """Номера страниц с кэшированным количеством записей.
+
+    Ответ содержит count_approximate: true, если count взят из кэша.
+    С ?exact_count=true количество считается запросом COUNT(*) и
+    обновляет кэш. Модели, от которых зависит количество, задаются
+    атрибутом count_models представления, по умолчанию - модель queryset.
+    Метод get_known_count() представления может вернуть количество из
+    денормализованного счётчика вместо COUNT(*).
+    """
+    exact_count_query_param = 'exact_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            # Поколения нужны только для count: в режиме курсора не читаются.
+            count_generations=partial(
+                get_generations,
+                getattr(view, 'count_models', (queryset.model,)), request,
+            ),
+            exact=request.query_params.get(
+                self.exact_count_query_param, ''
+            ).lower() in ('1', 'true'),
+            known_count=getattr(view, 'get_known_count', None),
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_approximate', paginator.count_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['count_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            'name': self.exact_count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Посчитать количество записей точно.',
+            'schema': {'type': 'boolean'},
+        }]
@@ -0,0 +1,28 @@
+"""JSON-парсер API на orjson, если он установлен."""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from api.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser, разбирающий тело запроса через orjson.
+
+    orjson принимает только UTF-8 и не принимает NaN и Infinity, как
+    JSONParser со STRICT_JSON. Без orjson, с выключенным STRICT_JSON и для
+    тела в другой кодировке работает JSONParser.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        utf8 = encoding.lower().replace('_', '-') == 'utf-8'
+        if orjson is None or not self.strict or not utf8:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -10,6 +10,19 @@ class IsAdminOnly(permissions.BasePermission):
         )
 
 
+class IsModeratorOrAdmin(permissions.BasePermission):
+    """Разрешения для инструментов модерации."""
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (
+                request.user.is_superuser
+                or request.user.is_admin
+                or request.user.is_moderator
+            )
+        )
+
+
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Разрешения для произведений, категорий, жанров."""
     def has_permission(self, request, view):
@@ -31,9 +44,10 @@ class IsAuthorIsModeratorIsAdminOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
+        # Сравниваем id, чтобы не загружать автора из базы.
         return (
-            obj.author == request.user
-            or request.user.is_superuser
+            request.user.is_superuser
             or request.user.is_admin
             or request.user.is_moderator
+            or obj.author_id == request.user.id
         )
@@ -0,0 +1,162 @@
+"""Быстрое чтение списков без ModelSerializer.
+
+План чтения (ReadPlan) заранее описывает, какие колонки выбрать через
+values() и как из них собрать поле ответа. Результат совпадает с
+выводом соответствующего сериализатора байт в байт после JSONRenderer,
+что проверяется тестами; при изменении сериализатора нужно обновить и
+план.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from api.renderers import renders_datetime_as_drf
+from reviews.models import GenreTitle
+from rest_framework import serializers
+
+
+class Column:
+    """Поле ответа, собираемое из колонок sources строки values()."""
+
+    def __init__(self, name, *sources, convert=None):
+        self.name = name
+        self.sources = sources or (name,)
+        if convert is None:
+            self.get = itemgetter(self.sources[0])
+        else:
+            getter = itemgetter(*self.sources)
+            if len(self.sources) == 1:
+                self.get = lambda row: convert(getter(row))
+            else:
+                self.get = lambda row: convert(*getter(row))
+
+
+class Related:
+    """Поле ответа, загружаемое отдельным запросом по id страницы.
+
+    load(ids) возвращает {id: значение}; для id без значения в ответ
+    попадает результат default().
+    """
+
+    def __init__(self, name, load, default=list):
+        self.name = name
+        self.load = load
+        self.default = default
+
+
+class ReadPlan:
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+    def only(self, names):
+        """План с полями из names, в порядке исходного плана."""
+        if names is None:
+            return self
+        return ReadPlan(*(
+            field for field in self.fields if field.name in names
+        ))
+
+    @property
+    def columns(self):
+        return [field for field in self.fields if isinstance(field, Column)]
+
+    def values(self, queryset):
+        """queryset.values() с колонками, нужными плану."""
+        sources = {'id'}
+        for column in self.columns:
+            sources.update(column.sources)
+        return queryset.prefetch_related(None).values(*sources)
+
+    def render(self, rows):
+        """Список словарей ответа для строк values()."""
+        rows = list(rows)
+        related = {
+            field.name: field.load([row['id'] for row in rows])
+            for field in self.fields if isinstance(field, Related)
+        }
+        result = []
+        for row in rows:
+            item = {}
+            for field in self.fields:
+                if isinstance(field, Column):
+                    item[field.name] = field.get(row)
+                else:
+                    value = related[field.name].get(row['id'])
+                    item[field.name] = (
+                        field.default() if value is None else value
+                    )
+            result.append(item)
+        return result
+
+
+def rating(rating_sum, rating_count):
+    if not rating_count:
+        return None
+    return rating_sum // rating_count
+
+
+def category(category_id, name, slug):
+    if category_id is None:
+        return None
+    return {'name': name, 'slug': slug}
+
+
+def title_genres(ids):
+    genres = defaultdict(list)
+    # Порядок как у prefetch_related('genre'): Genre.Meta.ordering.
+    rows = GenreTitle.objects.filter(title_id__in=ids).order_by(
+        '-genre_id'
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in rows:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return genres
+
+
+# Рендерер выводит datetime так же, как DateTimeField, поэтому значение
+# из базы не нужно переводить в строку для каждой строки.
+pub_date = (
+    None if renders_datetime_as_drf()
+    else serializers.DateTimeField().to_representation
+)
+
+# TitlesReadSerializer.
+TITLE_READ_PLAN = ReadPlan(
+    Column('id'),
+    Column('name'),
+    Column('year'),
+    Column('rating', 'rating_sum', 'rating_count', convert=rating),
+    Column('review_count'),
+    Column('description'),
+    Related('genre', title_genres),
+    Column(
+        'category', 'category_id', 'category__name', 'category__slug',
+        convert=category,
+    ),
+)
+
+# ReviewSerializer.
+REVIEW_READ_PLAN = ReadPlan(
+    Column('id'),
+    Column('text'),
+    Column('author', 'author__username'),
+    Column('score'),
+    Column('pub_date', convert=pub_date),
+    Column('comment_count'),
+)
+
+# CommentSerializer.
+COMMENT_READ_PLAN = ReadPlan(
+    Column('id'),
+    Column('text'),
+    Column('author', 'author__username'),
+    Column('pub_date', convert=pub_date),
+)
+
+# Выгрузка /export/*.ndjson: поля ответа API и id родительской записи.
+TITLE_EXPORT_PLAN = TITLE_READ_PLAN
+REVIEW_EXPORT_PLAN = ReadPlan(
+    *REVIEW_READ_PLAN.fields, Column('title', 'title_id')
+)
+COMMENT_EXPORT_PLAN = ReadPlan(
+    *COMMENT_READ_PLAN.fields, Column('review', 'review_id')
+)
@@ -0,0 +1,124 @@
+"""Быстрый JSON-рендерер API.
+
+Если установлен orjson, ответ сериализуется сразу в байты, а datetime,
+date, time и UUID выводятся им самим, без вызова Python-функции на
+каждое значение. Без orjson используется стандартный json с теми же
+настройками, что у JSONRenderer DRF, так что вывод обоих путей совпадает.
+"""
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import ISO_8601, api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Столько элементов списка сериализуется за раз при потоковом выводе:
+# вызывать orjson на каждый элемент заметно дороже.
+STREAM_BATCH_SIZE = 500
+
+
+def escape_separators(content):
+    """Экранирует U+2028 и U+2029, как JSONRenderer DRF.
+
+    Ответ копируется, только если эти символы в нём есть.
+    """
+    for char in ('\u2028', '\u2029'):
+        encoded = char.encode()
+        if encoded in content:
+            content = content.replace(encoded, char.encode('unicode_escape'))
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson с запасным путём на стандартном json.
+
+    Вывод совпадает с JSONRenderer байт в байт: компактные разделители,
+    символы не из ASCII без экранирования, datetime в UTC с суффиксом Z.
+    С отступами (?indent= или браузерный API) и на значениях, которые
+    orjson не принимает (целые больше 64 бит), работает JSONRenderer.
+    """
+
+    use_orjson = orjson is not None
+
+    def __init__(self):
+        encoder = self.encoder_class(
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=(',', ':'),
+        )
+        self.default = encoder.default
+        self.encode = encoder.encode
+
+    def dumps(self, data):
+        """Одно значение в компактный JSON (bytes)."""
+        if self.use_orjson:
+            try:
+                content = orjson.dumps(
+                    data, default=self.default, option=orjson.OPT_UTC_Z
+                )
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                return escape_separators(content)
+        return escape_separators(self.encode(data).encode())
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+    def iter_render(self, items, batch_size=STREAM_BATCH_SIZE):
+        """JSON-массив из items по частям в batch_size элементов.
+
+        items может быть генератором (например, queryset.iterator()):
+        в памяти одновременно держится только текущая часть.
+        """
+        items = iter(items)
+        separator = b'['
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                break
+            yield separator + self.dumps(batch)[1:-1]
+            separator = b','
+        yield b'[]' if separator == b'[' else b']'
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """JSON Lines: по значению на строку.
+
+    Ответ view (например, ошибка) выводится одной строкой, списки для
+    потоковой выгрузки - через render_lines().
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return self.dumps(data) + b'\n'
+
+    def render_lines(self, items):
+        return b''.join(self.dumps(item) + b'\n' for item in items)
+
+
+def renders_datetime_as_drf():
+    """Выводит ли FastJSONRenderer datetime так же, как DateTimeField.
+
+    DateTimeField переводит время в текущую зону, а рендерер выводит его
+    как есть, поэтому совпадение гарантировано только для зоны UTC и
+    формата ISO 8601 по умолчанию.
+    """
+    return (
+        settings.USE_TZ
+        and settings.TIME_ZONE == 'UTC'
+        and api_settings.DATETIME_FORMAT == ISO_8601
+    )
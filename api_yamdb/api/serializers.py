@@ -1,11 +1,17 @@
 from datetime import datetime
+from html import escape
 
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError, NotFound
+from rest_framework.settings import api_settings
 import re
 
-from ..reviews.models import User, Categories, Genre, Title, Review, Comment
+from reviews.models import (MAX_SCORE, MIN_SCORE, User, Categories, Genre,
+                            GenreTitle, Title, Review, Comment)
+from reviews.search import MATCH_END, MATCH_START
 
 
 class UserSignupSerializer(serializers.ModelSerializer):
@@ -89,14 +95,14 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date', 'comment_count')
         ordering = ['-id']
 
     def create(self, validated_data):
         return Review.objects.create(**validated_data)
 
     def validate_score(self, value):
-        if value > 10 or value < 1:
+        if value > MAX_SCORE or value < MIN_SCORE:
             raise ValidationError('Оценка должна быть от 1 до 10.')
         return value
 
@@ -128,16 +134,92 @@ class GenresSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitlesReadSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Оставляет только поля из context['fields'] и добавляет раскрытые.
+
+    context['fields'] - множество имён полей или None (все поля),
+    context['expand'] - имена из expandable_fields, которые нужно
+    добавить в ответ.
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is not None:
+            fields = type(fields)(
+                (name, field) for name, field in fields.items()
+                if name in requested
+            )
+        for name in self.context.get('expand', ()):
+            fields[name] = self.expandable_fields[name]()
+        return fields
+
+
+class TitlesReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для чтения произведений."""
     category = CategoriesSerializer(read_only=True)
     genre = GenresSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
+
+    expandable_fields = {
+        'reviews': lambda: ReviewSerializer(
+            source='latest_reviews', many=True, read_only=True
+        ),
+    }
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'review_count', 'description',
+            'genre', 'category')
+
+
+class TopTitlesSerializer(TitlesReadSerializer):
+    """Сериализатор для списка лучших произведений."""
+    weighted_rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitlesReadSerializer.Meta):
+        fields = TitlesReadSerializer.Meta.fields + ('weighted_rating',)
+
+
+class TitleAutocompleteSerializer(serializers.Serializer):
+    """Сериализатор для подсказок названий произведений."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор для распределения оценок произведения."""
+    count = serializers.IntegerField(source='rating_count', read_only=True)
+    mean = serializers.FloatField(source='rating_mean', read_only=True)
+    distribution = serializers.DictField(
+        source='score_distribution',
+        child=serializers.IntegerField(),
+        read_only=True,
+    )
+
+    class Meta:
+        model = Title
+        fields = ('id', 'count', 'mean', 'distribution')
+
+
+class TextSearchResultSerializer(serializers.Serializer):
+    """Сериализатор для найденных отзывов и комментариев."""
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField(source='object_id')
+    title_id = serializers.IntegerField(source='title_pk')
+    review_id = serializers.IntegerField(source='review_pk')
+    author = serializers.CharField(source='author_name')
+    text = serializers.CharField(source='body')
+    pub_date = serializers.DateTimeField(source='published')
+    snippet = serializers.SerializerMethodField()
+
+    def get_snippet(self, obj):
+        """Фрагмент текста, найденные слова выделены тегом <mark>."""
+        return escape(obj['search_snippet']).replace(
+            MATCH_START, '<mark>'
+        ).replace(MATCH_END, '</mark>')
 
 
 class TitlesWriteSerializer(serializers.ModelSerializer):
@@ -160,3 +242,104 @@ class TitlesWriteSerializer(serializers.ModelSerializer):
         if value > datetime.now().year:
             raise ValidationError('Неверный год')
         return value
+
+
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет объект в context['slug_lookups'].
+
+    Словарь {модель: {slug: объект}} заполняется заранее одним запросом на
+    модель, а не запросом на каждое значение.
+    """
+
+    def to_internal_value(self, data):
+        lookup = self.context['slug_lookups'][self.queryset.model]
+        try:
+            return lookup[str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=str(data)
+            )
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitlesBulkListSerializer(serializers.ListSerializer):
+    """Создание списка произведений: все или ни одного.
+
+    Категории и жанры всех элементов загружаются двумя запросами,
+    произведения и связи с жанрами вставляются через bulk_create.
+    При ошибках возвращается список ошибок по элементам ({} у корректных).
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            limit = settings.TITLES_BULK_MAX_SIZE
+            if len(data) > limit:
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f'Не больше {limit} произведений за запрос.'
+                    ]
+                })
+            self.context['slug_lookups'] = self.get_slug_lookups(data)
+        return super().to_internal_value(data)
+
+    def get_slug_lookups(self, data):
+        slugs = {Categories: set(), Genre: set()}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            slugs[Categories].add(str(item.get('category')))
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                slugs[Genre].update(map(str, genres))
+        return {
+            model: model.objects.in_bulk(values, field_name='slug')
+            for model, values in slugs.items()
+        }
+
+    def create(self, validated_data):
+        titles = []
+        genres = []
+        for item in validated_data:
+            # Повторы жанра нарушили бы уникальность связи.
+            genres.append(list(dict.fromkeys(item.pop('bulk_genres'))))
+            titles.append(Title(**item))
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            if titles and titles[0].pk is None:
+                # SQLite в Django 3.2 не возвращает id из bulk_create. До
+                # конца транзакции таблица заблокирована для других
+                # записей, а id растут (AUTOINCREMENT), поэтому новые
+                # произведения - последние len(titles) записей.
+                ids = Title.objects.order_by('-id').values_list(
+                    'id', flat=True
+                )[:len(titles)]
+                for title, pk in zip(titles, reversed(ids)):
+                    title.pk = pk
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title_id=title.pk, genre_id=genre.pk)
+                for title, title_genres in zip(titles, genres)
+                for genre in title_genres
+            )
+        for title, title_genres in zip(titles, genres):
+            title.bulk_genres = title_genres
+        return titles
+
+
+class TitlesBulkWriteSerializer(TitlesWriteSerializer):
+    """Элемент списка для создания произведений одним запросом."""
+    category = PrefetchedSlugRelatedField(
+        queryset=Categories.objects.all(),
+        slug_field='slug'
+    )
+    # Жанры созданных произведений не загружаются из базы, а берутся из
+    # атрибута, который заполняет TitlesBulkListSerializer.create().
+    genre = PrefetchedSlugRelatedField(
+        queryset=Genre.objects.all(),
+        many=True,
+        slug_field='slug',
+        source='bulk_genres',
+    )
+
+    class Meta(TitlesWriteSerializer.Meta):
+        list_serializer_class = TitlesBulkListSerializer
@@ -1,10 +1,12 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework import routers
 
 from .views import (CategoriesListCreateDestroyApiView, CommentViewSet,
-                    GenresListCreateDestroyApiView, ReviewViewSet,
-                    SignupViewSet, TitlesListCreateDestroyRetriveApiView,
-                    TokenViewSet, UsersDetailRegViewSet, UsersListRegViewSet,
+                    ExportView, GenresListCreateDestroyApiView,
+                    ResponseCacheStatsView, ReviewTextSearchView,
+                    ReviewViewSet, SignupViewSet,
+                    TitlesListCreateDestroyRetriveApiView, TokenViewSet,
+                    UsersDetailRegViewSet, UsersListRegViewSet,
                     UsersRetrieveUpdateApiView)
 
 app_name = 'api'
@@ -57,8 +59,28 @@ users_endpoint = [
     ),
 ]
 
+search_endpoints = [
+    # Эндпоинт для поиска по текстам отзывов и комментариев.
+    path('reviews/', ReviewTextSearchView.as_view(), name='search_reviews'),
+]
+
+export_endpoints = [
+    # Потоковая выгрузка таблиц для аналитики.
+    re_path(r'^(?P<resource>\w+)\.ndjson$', ExportView.as_view(),
+            name='export'),
+]
+
+cache_endpoints = [
+    # Статистика кэша ответов на запросы без токена.
+    path('stats/', ResponseCacheStatsView.as_view(),
+         name='response_cache_stats'),
+]
+
 urlpatterns = [
     path('v1/auth/', include(auth_endpoints)),
     path('v1/users/', include(users_endpoint)),
+    path('v1/search/', include(search_endpoints)),
+    path('v1/export/', include(export_endpoints)),
+    path('v1/cache/', include(cache_endpoints)),
     path('v1/', include(v1_router.urls)),
 ]
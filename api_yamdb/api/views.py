@@ -1,27 +1,143 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-    from django.db.models import Avg
+from django.db import router, transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import exceptions, filters, mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import (CreateAPIView, ListCreateAPIView,
-                                     RetrieveUpdateAPIView,
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.generics import (CreateAPIView, ListAPIView,
+                                     ListCreateAPIView, RetrieveUpdateAPIView,
                                      RetrieveUpdateDestroyAPIView)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-from ..reviews.models import Categories, Genre, Review, Title, User
-
-from .filters import TitleFilter
+from reviews import search
+from reviews.autocomplete import title_index
+from reviews.generations import bump_generation, get_generations
+from reviews.models import (Categories, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+from .exports import EXPORTS
+from .filters import (FullTextSearchFilter, IdTiebreakOrderingFilter,
+                      TitleFilter)
+from .middleware import response_cache_stats
+from .pagination import ApproximateCountPagination, IdCursorPagination
+from .readers import COMMENT_READ_PLAN, REVIEW_READ_PLAN, TITLE_READ_PLAN
+from .renderers import FastJSONRenderer, NDJSONRenderer
 from .permissions import (IsAdminOnly, IsAdminOrReadOnly,
-                          IsAuthorIsModeratorIsAdminOrReadOnly)
+                          IsAuthorIsModeratorIsAdminOrReadOnly,
+                          IsModeratorOrAdmin)
 from .serializers import (CategoriesSerializer, CommentSerializer,
                           GenresSerializer, ReviewSerializer,
+                          TextSearchResultSerializer,
+                          TitleAutocompleteSerializer, TitleStatsSerializer,
+                          TitlesBulkWriteSerializer,
                           TitlesReadSerializer, TitlesWriteSerializer,
-                          TokenSerializer, UserSignupSerializer,
+                          TokenSerializer,
+                          TopTitlesSerializer, UserSignupSerializer,
                           UsersRegSerializer, UsersSerializer)
 from .utils import custom_send_mail, get_tokens_for_user
 
 
+def get_limit(request, default, maximum):
+    """Параметр limit запроса: целое число от 1 до maximum."""
+    limit = request.query_params.get('limit', default)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'Ожидается целое число.'})
+    if not 1 <= limit <= maximum:
+        raise ValidationError({
+            'limit': f'Значение должно быть от 1 до {maximum}.'
+        })
+    return limit
+
+
+def get_ids(request, maximum):
+    """Параметр ids запроса: до maximum целых id через запятую, без
+    повторов и в исходном порядке."""
+    value = request.query_params.get('ids', '')
+    try:
+        ids = [int(pk) for pk in value.split(',') if pk.strip()]
+    except ValueError:
+        raise ValidationError({'ids': 'Ожидаются целые числа через запятую.'})
+    ids = list(dict.fromkeys(ids))
+    if not 1 <= len(ids) <= maximum:
+        raise ValidationError({
+            'ids': f'Укажите от 1 до {maximum} id через запятую.'
+        })
+    return ids
+
+
+def latest_reviews(count):
+    """Последние count отзывов каждого произведения, для Prefetch."""
+    latest = Review.objects.filter(
+        title=OuterRef('title')
+    ).order_by('-id').values('id')[:count]
+    return Review.objects.filter(
+        id__in=Subquery(latest)
+    ).select_related('author')
+
+
+class FastReadMixin:
+    """list и retrieve через план чтения из api.readers.
+
+    Строки выбираются через values() и собираются в ответ по плану без
+    ModelSerializer; ответ совпадает с выводом serializer_class.
+    Если get_read_plan() возвращает None, работает сериализатор.
+    Права на объект проверяются на экземпляре модели, а не на строке.
+    """
+    read_plan = None
+
+    def get_read_plan(self):
+        if self.action in ('list', 'retrieve'):
+            return self.read_plan
+        return None
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, self.get_permission_object(
+            queryset.model, row
+        ))
+        return Response(plan.render([row])[0])
+
+    @staticmethod
+    def get_permission_object(model, row):
+        """Экземпляр model с pk из строки плана.
+
+        Остальные поля отложены: они загружаются из базы, только если
+        разрешение их прочитает, поэтому безопасные запросы к
+        IsAuthorIsModeratorIsAdminOrReadOnly лишних запросов не делают.
+        """
+        pk = model._meta.pk
+        return model.from_db(
+            router.db_for_read(model), [pk.attname], [row[pk.attname]]
+        )
+
+
 class SignupViewSet(CreateAPIView):
     """Самостоятельная регистрация пользователя."""
     permission_classes = (AllowAny,)
@@ -67,7 +183,7 @@ class CategoriesListCreateDestroyApiView(viewsets.GenericViewSet,
                                          mixins.ListModelMixin):
     """Работа с категориями."""
     serializer_class = CategoriesSerializer
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (FullTextSearchFilter,)
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Categories.objects.all()
@@ -87,7 +203,7 @@ class GenresListCreateDestroyApiView(viewsets.GenericViewSet,
                                      mixins.ListModelMixin):
     """Работа с жанрами."""
     serializer_class = GenresSerializer
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (FullTextSearchFilter,)
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Genre.objects.all()
@@ -101,64 +217,354 @@ class GenresListCreateDestroyApiView(viewsets.GenericViewSet,
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TitlesListCreateDestroyRetriveApiView(viewsets.ModelViewSet):
+class TitlesListCreateDestroyRetriveApiView(FastReadMixin,
+                                            viewsets.ModelViewSet):
     """Работа с произведениями."""
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-id')
+    queryset = Title.objects.order_by('-id')
+    read_plan = TITLE_READ_PLAN
+    pagination_class = ApproximateCountPagination
+    count_models = (Title, GenreTitle, Genre, Categories)
+    filter_backends = (
+        DjangoFilterBackend, FullTextSearchFilter, IdTiebreakOrderingFilter
+    )
     filterset_class = TitleFilter
+    search_fields = ('name', 'description')
+    ordering_fields = ('id', 'review_count')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'top'):
+            fields = self.get_requested_fields()
+            # Связанные объекты загружаются, только если их поля нужны.
+            if fields is None or 'category' in fields:
+                queryset = queryset.select_related('category')
+            if fields is None or 'genre' in fields:
+                queryset = queryset.prefetch_related('genre')
+            if 'reviews' in self.get_expanded_fields():
+                queryset = queryset.prefetch_related(Prefetch(
+                    'reviews',
+                    queryset=latest_reviews(settings.EXPAND_REVIEWS_COUNT),
+                    to_attr='latest_reviews',
+                ))
+        return queryset
+
+    def get_read_plan(self):
+        # Раскрытые поля собирает сериализатор.
+        if self.get_expanded_fields():
+            return None
+        plan = super().get_read_plan()
+        return plan and plan.only(self.get_requested_fields())
+
+    def get_requested_fields(self):
+        """Поля из ?fields=id,name или None, если параметра нет.
+
+        Допустимы только поля сериализатора текущего действия.
+        """
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        fields = set(value.split(','))
+        unknown = fields - set(self.get_serializer_class().Meta.fields)
+        if unknown:
+            raise ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        return fields
+
+    def get_expanded_fields(self):
+        """Раскрываемые поля из ?expand=reviews."""
+        value = self.request.query_params.get('expand')
+        if not value:
+            return ()
+        fields = set(value.split(','))
+        unknown = fields - set(TitlesReadSerializer.expandable_fields)
+        if unknown:
+            raise ValidationError({
+                'expand': f'Нельзя раскрыть: {", ".join(sorted(unknown))}.'
+            })
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'retrieve', 'top'):
+            context['fields'] = self.get_requested_fields()
+            context['expand'] = self.get_expanded_fields()
+        return context
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'batch'):
             return TitlesReadSerializer
+        if self.action == 'stats':
+            return TitleStatsSerializer
+        if self.action == 'top':
+            return TopTitlesSerializer
+        if self.action == 'autocomplete':
+            return TitleAutocompleteSerializer
+        if self.action == 'bulk':
+            return TitlesBulkWriteSerializer
         return TitlesWriteSerializer
 
+    def perform_create(self, serializer):
+        title = serializer.save()
+        transaction.on_commit(lambda: title_index.add(title.pk, title.name))
+
+    def perform_update(self, serializer):
+        title = serializer.save()
+        transaction.on_commit(lambda: title_index.add(title.pk, title.name))
+
+    def perform_destroy(self, instance):
+        pk = instance.pk
+        instance.delete()
+        transaction.on_commit(lambda: title_index.remove(pk))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Создание списка произведений одной транзакцией."""
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+
+        def titles_created():
+            # bulk_create не отправляет post_save, поэтому поколения и
+            # индекс подсказок обновляются здесь.
+            bump_generation(Title)
+            bump_generation(GenreTitle)
+            title_index.add_many(
+                [(title.pk, title.name) for title in titles]
+            )
+
+        transaction.on_commit(titles_created)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False)
+    def batch(self, request):
+        """Произведения по списку ?ids=1,2,3 с ключами-id.
+
+        Не найденные id перечисляются в missing. Поддерживается ?fields=.
+        """
+        ids = get_ids(request, settings.TITLES_BATCH_MAX_SIZE)
+        plan = TITLE_READ_PLAN.only(self.get_requested_fields())
+        rows = list(plan.values(Title.objects.filter(id__in=ids)))
+        found = {
+            row['id']: item for row, item in zip(rows, plan.render(rows))
+        }
+        return Response({
+            'results': {str(pk): found[pk] for pk in ids if pk in found},
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    @action(detail=False)
+    def autocomplete(self, request):
+        """Подсказки названий с учётом опечаток из индекса в памяти."""
+        limit = get_limit(
+            request,
+            settings.AUTOCOMPLETE_DEFAULT_LIMIT,
+            settings.AUTOCOMPLETE_MAX_LIMIT,
+        )
+        titles = [
+            {'id': pk, 'name': name}
+            for pk, name in title_index.search(
+                request.query_params.get('q', ''), limit,
+                # Поколение уже прочитано middleware кэша.
+                get_generations((Title,), request)[0],
+            )
+        ]
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие произведения по байесовскому рейтингу."""
+        limit = get_limit(
+            request,
+            settings.TOP_RATED_DEFAULT_LIMIT,
+            settings.TOP_RATED_MAX_LIMIT,
+        )
+        titles = self.filter_queryset(self.get_queryset()).filter(
+            weighted_rating__isnull=False
+        ).order_by('-weighted_rating', '-id')[:limit]
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True)
+    def page(self, request, pk=None):
+        """Данные страницы произведения одним запросом к API.
+
+        Произведение, распределение оценок и первая страница отзывов по
+        курсору. Ссылка next ведёт на список отзывов, так что следующие
+        страницы берутся оттуда.
+        """
+        title = get_object_or_404(
+            Title.objects.select_related('category').prefetch_related('genre'),
+            pk=pk,
+        )
+        paginator = IdCursorPagination()
+        rows = paginator.paginate_queryset(
+            REVIEW_READ_PLAN.values(Review.objects.filter(title=title)),
+            request, view=self,
+        )
+        paginator.base_url = request.build_absolute_uri(reverse(
+            'api:reviews-list', kwargs={'title_id': title.pk}
+        ))
+        return Response({
+            'title': TitlesReadSerializer(title).data,
+            'stats': TitleStatsSerializer(title).data,
+            'reviews': {
+                'next': paginator.get_next_link(),
+                'results': REVIEW_READ_PLAN.render(rows),
+            },
+        })
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Распределение оценок произведения по готовым счётчикам."""
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(FastReadMixin, viewsets.ModelViewSet):
     """Работа с отзывами."""
     serializer_class = ReviewSerializer
+    read_plan = REVIEW_READ_PLAN
     permission_classes = (IsAuthorIsModeratorIsAdminOrReadOnly,)
+    pagination_class = ApproximateCountPagination
+    filter_backends = (IdTiebreakOrderingFilter,)
+    ordering_fields = ('id', 'comment_count')
 
-    def get_queryset(self):
-        title = get_object_or_404(
-            Title,
+    def get_title(self):
+        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+
+    def get_known_count(self):
+        """Количество отзывов из счётчика произведения."""
+        return Title.objects.filter(
             id=self.kwargs.get('title_id')
-        )
-        return title.reviews.all()
+        ).values_list('review_count', flat=True).first()
 
+    def get_queryset(self):
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница: отличаем произведение без отзывов
+            # от несуществующего.
+            self.get_title()
+        return page
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id')
-        )
+        title = self.get_title()
         if Review.objects.filter(title=title, author=self.request.user):
             raise ValidationError('Комментарий вами уже оставлен.')
         serializer.save(author=self.request.user, title=title)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(FastReadMixin, viewsets.ModelViewSet):
     """Работа с комментариями."""
     serializer_class = CommentSerializer
+    read_plan = COMMENT_READ_PLAN
     permission_classes = (IsAuthorIsModeratorIsAdminOrReadOnly,)
+    pagination_class = ApproximateCountPagination
+    count_models = (Comment, Review)
 
-    def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id')
-        )
-        review = get_object_or_404(
-            title.reviews.all(),
-            id=self.kwargs.get('review_id')
+    def get_review(self):
+        return get_object_or_404(
+            Review,
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id')
         )
-        return review.comments.all()
 
-    def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review.objects.select_related('author', 'title'),
+    def get_queryset(self):
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def get_known_count(self):
+        """Количество комментариев из счётчика отзыва."""
+        return Review.objects.filter(
             id=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
+            title_id=self.kwargs.get('title_id'),
+        ).values_list('comment_count', flat=True).first()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница: отличаем отзыв без комментариев
+            # от несуществующего отзыва.
+            self.get_review()
+        return page
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+class ReviewTextSearchView(ListAPIView):
+    """Поиск по текстам отзывов и комментариев для модераторов."""
+    permission_classes = (IsModeratorOrAdmin,)
+    serializer_class = TextSearchResultSerializer
+    filter_backends = ()
+    # Результаты упорядочены по релевантности, курсор по id к ним неприменим.
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self):
+        if not search.is_available():
+            raise exceptions.APIException(
+                'Полнотекстовый поиск недоступен для этой базы данных.'
+            )
+        text = self.request.query_params.get('q', '')
+        if not search.fts_query(text):
+            raise ValidationError({'q': 'Укажите слова для поиска.'})
+        return search.text_search(text)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов или комментариев."""
+    permission_classes = (IsAdminOnly,)
+    # Ошибки отдаются в JSON; NDJSONRenderer нужен, чтобы не отвечать 406
+    # на Accept: application/x-ndjson.
+    renderer_classes = (FastJSONRenderer, NDJSONRenderer)
+
+    def get(self, request, resource):
+        export = EXPORTS.get(resource)
+        if export is None:
+            raise Http404
+        queryset = export.get_queryset(request.query_params.get('since'))
+        response = StreamingHttpResponse(
+            export.iter_chunks(queryset),
+            content_type=NDJSONRenderer.media_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.ndjson"'
         )
-        serializer.save(author=self.request.user, review=review)
+        return response
+
+
+class ResponseCacheStatsView(APIView):
+    """Попадания и промахи кэша ответов на запросы без токена в процессе,
+    обработавшем запрос."""
+    permission_classes = (IsAdminOnly,)
+
+    def get(self, request):
+        return Response(response_cache_stats())
 
 
 class UsersRetrieveUpdateApiView(RetrieveUpdateAPIView):
@@ -188,6 +594,7 @@ class UsersListRegViewSet(ListCreateAPIView):
     permission_classes = (IsAdminOnly,)
     serializer_class = UsersRegSerializer
     queryset = User.objects.all().order_by('id')
+    cursor_ordering = 'id'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
 
@@ -40,8 +40,41 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ConditionalGetMiddleware',
+    'api.middleware.AnonymousResponseCacheMiddleware',
 ]
 
+# Подсчёт SQL-запросов API и поиск N+1, включается QUERY_BUDGET=true.
+# Стоит перед middleware кэша, чтобы учитывать и чтение поколений моделей.
+if os.getenv('QUERY_BUDGET', 'false').lower() == 'true':
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('api.middleware.ConditionalGetMiddleware'),
+        'api.middleware.QueryBudgetMiddleware',
+    )
+
+# Бюджеты GET-запросов с учётом загрузки пользователя из JWT-токена и
+# чтения поколений моделей middleware кэша (RESPONSE_CACHE['ROUTES']).
+QUERY_BUDGET = {
+    'DEFAULT': 10,
+    'ROUTES': {
+        'api:titles-list': 5,
+        'api:titles-detail': 4,
+        'api:titles-top': 4,
+        'api:titles-stats': 3,
+        'api:titles-page': 5,
+        'api:titles-autocomplete': 2,
+        'api:titles-batch': 4,
+        'api:reviews-list': 3,
+        'api:reviews-detail': 3,
+        'api:comments-list': 3,
+        'api:comments-detail': 3,
+        'api:categories-list': 4,
+        'api:genres-list': 4,
+        'api:search_reviews': 3,
+    },
+    'ACTION': os.getenv('QUERY_BUDGET_ACTION', 'log'),
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -73,6 +106,21 @@ DATABASES = {
     }
 }
 
+# Кэш ответов и количества записей. Ключи содержат поколения моделей из
+# базы, поэтому кэш в памяти процесса не отдаёт устаревших ответов после
+# записи в другом процессе; общий кэш (Memcached) задаётся переменными
+# CACHE_BACKEND и CACHE_LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
 
 # Password validation
 
@@ -131,14 +179,74 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrCursorPagination',
     'PAGE_SIZE': 5,
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 ADMIN = 'admin'
 MODERATOR = 'moderator'
 USER = 'user'
+
+# Байесовский рейтинг для списка лучших произведений: к оценкам каждого
+# произведения добавляется TOP_RATED_PRIOR_VOTES голосов со средней
+# оценкой TOP_RATED_PRIOR_SCORE, чтобы одна десятка не выводила в топ.
+# Рейтинг хранится в Title.weighted_rating: после изменения этих настроек
+# выполните python manage.py rebuild_title_aggregates.
+TOP_RATED_PRIOR_SCORE = 6
+TOP_RATED_PRIOR_VOTES = 10
+TOP_RATED_DEFAULT_LIMIT = 10
+TOP_RATED_MAX_LIMIT = 100
+
+# Сколько последних отзывов добавляет в произведение ?expand=reviews.
+EXPAND_REVIEWS_COUNT = 3
+
+# Сколько секунд хранится в кэше количество записей в списках.
+COUNT_CACHE_TTL = 60
+
+# Кэш ответов на запросы без токена и заголовки ETag и Last-Modified.
+# ROUTES - модели, от которых зависят ответы маршрутов: отзывы показывают
+# имя автора и число комментариев, произведения - рейтинг, а на странице
+# и с ?expand=reviews - отзывы.
+_TITLE_MODELS = (
+    'reviews.Title', 'reviews.GenreTitle', 'reviews.Genre',
+    'reviews.Categories',
+)
+_REVIEW_MODELS = ('reviews.Review', 'reviews.Comment', 'users.User')
+RESPONSE_CACHE = {
+    'TIMEOUT': 300,
+    'ROUTES': {
+        'api:categories': ('reviews.Categories',),
+        'api:genres': ('reviews.Genre',),
+        'api:titles': _TITLE_MODELS + _REVIEW_MODELS,
+        'api:reviews': ('reviews.Title',) + _REVIEW_MODELS,
+        'api:comments': _REVIEW_MODELS,
+    },
+}
+
+# Количество подсказок в /titles/autocomplete/.
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Сколько произведений можно запросить одним запросом к /titles/batch/.
+TITLES_BATCH_MAX_SIZE = 300
+
+# Сколько произведений можно создать одним запросом к /titles/bulk/.
+TITLES_BULK_MAX_SIZE = 5000
+
+# Сколько строк выбирается одним запросом при выгрузке /export/*.ndjson.
+EXPORT_CHUNK_SIZE = 2000
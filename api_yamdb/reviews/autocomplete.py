@@ -0,0 +1,272 @@
+"""Автодополнение названий произведений из индекса в памяти процесса.
+
+Индекс строится из Title.name при первом обращении и обновляется
+вьюсетом произведений при создании, изменении и удалении. Каждый процесс
+держит свою копию и помнит поколение Title, на котором она построена
+(generations.py). Если при поиске поколение другое, в произведения писали
+другие процессы или код в обход API, и индекс строится заново. Изменения
+в обход сигналов ORM (update(), SQL) поколение не меняют и попадут в
+индекс после вызова clear() или следующей записи через ORM.
+"""
+import heapq
+import math
+import re
+import threading
+
+from reviews.generations import get_generations
+from reviews.models import Title
+
+WORD = re.compile(r'\w+')
+# Не больше стольких произведений собирается из поддерева префикса:
+# короткий префикс совпадает с большей частью каталога.
+MAX_PREFIX_CANDIDATES = 1000
+MIN_SIMILARITY = 0.3
+
+
+def normalize(text):
+    return ' '.join(WORD.findall(text.lower().replace('ё', 'е')))
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def allowed_typos(query):
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+class TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class TitleAutocompleteIndex:
+    """Префиксное дерево слов названий и инвертированный индекс триграмм."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.clear()
+
+    def clear(self):
+        """Сбрасывает индекс; он будет построен заново при обращении."""
+        with self.lock:
+            self.names = {}
+            self.normalized = {}
+            self.trie = TrieNode()
+            self.postings = {}
+            self.loaded = False
+            self.generation = None
+
+    def ensure_loaded(self, generation=None):
+        """Строит индекс, если он не построен или построен на поколении
+        Title, отличном от generation (по умолчанию - текущего)."""
+        if generation is None:
+            generation = current_generation()
+        with self.lock:
+            if self.loaded and self.generation == generation:
+                return
+            self.clear()
+            # Поколение прочитано до названий: запись между этими
+            # чтениями изменит поколение, и индекс построится снова.
+            for pk, name in Title.objects.values_list('pk', 'name'):
+                self._add(pk, name)
+            self.loaded = True
+            self.generation = generation
+
+    def add(self, pk, name):
+        """Добавляет произведение или обновляет его название."""
+        self.add_many([(pk, name)])
+
+    def add_many(self, titles):
+        """Добавляет пары (id, название) после записи этим процессом."""
+        with self.lock:
+            if not self.loaded:
+                return
+            for pk, name in titles:
+                self._remove(pk)
+                self._add(pk, name)
+            self._written()
+
+    def remove(self, pk):
+        with self.lock:
+            if self.loaded:
+                self._remove(pk)
+                self._written()
+
+    def _written(self):
+        # Запись этого процесса уже увеличила поколение Title на единицу.
+        # Если оно выросло больше, писали и другие процессы: индекс
+        # построится заново при следующем поиске.
+        generation = current_generation()
+        if generation - self.generation > 1:
+            self.loaded = False
+        else:
+            self.generation = generation
+
+    def _add(self, pk, name):
+        text = normalize(name)
+        self.names[pk] = name
+        self.normalized[pk] = text
+        for word in set(text.split()):
+            node = self.trie
+            for char in word:
+                node = node.children.setdefault(char, TrieNode())
+            node.ids.add(pk)
+        for gram in trigrams(text):
+            self.postings.setdefault(gram, set()).add(pk)
+
+    def _remove(self, pk):
+        text = self.normalized.pop(pk, None)
+        if text is None:
+            return
+        del self.names[pk]
+        for word in set(text.split()):
+            path = [self.trie]
+            for char in word:
+                path.append(path[-1].children[char])
+            path[-1].ids.discard(pk)
+            # Удаляем опустевшие узлы снизу вверх.
+            for depth in range(len(word), 0, -1):
+                node = path[depth]
+                if node.ids or node.children:
+                    break
+                del path[depth - 1].children[word[depth - 1]]
+        for gram in trigrams(text):
+            posting = self.postings[gram]
+            posting.discard(pk)
+            if not posting:
+                del self.postings[gram]
+
+    def _collect(self, node, found, distance):
+        """Добавляет в found произведения из поддерева node."""
+        stack = [node]
+        while stack and len(found) < MAX_PREFIX_CANDIDATES:
+            node = stack.pop()
+            for pk in node.ids:
+                if distance < found.get(pk, distance + 1):
+                    found[pk] = distance
+            stack.extend(node.children.values())
+
+    def prefix_ids(self, prefix, typos=0):
+        """Произведения со словом, начало которого отличается от prefix
+        не больше чем на typos правок, и число правок для каждого.
+
+        Первая буква должна совпадать: опечатки в ней редки, а без этого
+        пришлось бы обходить почти всё дерево. Дальше дерево обходится
+        вместе со строками матрицы Левенштейна: ветка отбрасывается, как
+        только все значения в строке больше typos.
+        """
+        found = {}
+        node = self.trie.children.get(prefix[0])
+        if node is None:
+            return found
+        stack = [(node, [1] + list(range(len(prefix))))]
+        while stack and len(found) < MAX_PREFIX_CANDIDATES:
+            node, row = stack.pop()
+            if row[-1] <= typos:
+                # Подходит всё поддерево. Глубже расстояние ещё может
+                # уменьшиться, если только совпадение уже не точное.
+                self._collect(node, found, row[-1])
+                if row[-1] == 0:
+                    continue
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for j, expected in enumerate(prefix, 1):
+                    next_row.append(min(
+                        row[j] + 1,
+                        next_row[j - 1] + 1,
+                        row[j - 1] + (expected != char),
+                    ))
+                if min(next_row) <= typos:
+                    stack.append((child, next_row))
+        return found
+
+    def _add_matching_words(self, query, scores, typos):
+        """Добавляет в scores названия, где каждое слово запроса - начало
+        какого-либо слова; с typos=True - с учётом допустимых опечаток."""
+        matched = None
+        for word in query.split():
+            found = self.prefix_ids(word, allowed_typos(word) if typos else 0)
+            if matched is None:
+                matched = found
+            else:
+                matched = {
+                    pk: matched[pk] + distance
+                    for pk, distance in found.items() if pk in matched
+                }
+        for pk, distance in matched.items():
+            if pk in scores:
+                continue
+            text = self.normalized[pk]
+            if distance:
+                scores[pk] = 2 - distance / len(query)
+            else:
+                bonus = 1 if text.startswith(query) else 0
+                scores[pk] = 3 + bonus + len(query) / len(text)
+
+    def _add_similar(self, query, scores):
+        """Добавляет в scores названия, похожие на query по триграммам.
+
+        Сходство - доля общих триграмм, не меньше MIN_SIMILARITY. Значит,
+        общих триграмм не меньше min_shared, и кандидаты собираются только
+        из len(grams) - min_shared + 1 самых коротких списков, а остальные
+        списки лишь проверяются на вхождение.
+        """
+        grams = sorted(
+            trigrams(query), key=lambda gram: len(self.postings.get(gram, ()))
+        )
+        min_shared = math.ceil(MIN_SIMILARITY * len(grams))
+        candidates = set()
+        for gram in grams[:len(grams) - min_shared + 1]:
+            candidates |= self.postings.get(gram, set())
+        candidates -= scores.keys()
+        postings = [self.postings.get(gram, set()) for gram in grams]
+        query_grams = set(grams)
+        for pk in candidates:
+            shared = sum(pk in posting for posting in postings)
+            if shared < min_shared:
+                continue
+            similarity = shared / len(query_grams | trigrams(
+                self.normalized[pk]
+            ))
+            if similarity >= MIN_SIMILARITY:
+                scores[pk] = similarity
+
+    def search(self, query, limit, generation=None):
+        """До limit пар (id, название), лучшие совпадения первыми.
+
+        Сначала идут названия, где каждое слово запроса - начало
+        какого-либо слова названия, затем такие же совпадения с одной-двумя
+        опечатками, затем названия, похожие на запрос по триграммам.
+        generation - текущее поколение Title, если оно уже прочитано.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        self.ensure_loaded(generation)
+        with self.lock:
+            scores = {}
+            self._add_matching_words(query, scores, typos=False)
+            if len(scores) < limit:
+                self._add_matching_words(query, scores, typos=True)
+            if len(scores) < limit:
+                self._add_similar(query, scores)
+            best = heapq.nsmallest(
+                limit, scores,
+                key=lambda pk: (-scores[pk], self.names[pk], pk),
+            )
+            return [(pk, self.names[pk]) for pk in best]
+
+
+def current_generation():
+    return get_generations((Title,))[0]
+
+
+title_index = TitleAutocompleteIndex()
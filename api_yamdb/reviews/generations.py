@@ -0,0 +1,83 @@
+"""Счётчики поколений моделей для ключей кэша.
+
+Поколение модели увеличивается после каждой записи в её таблицу через
+ORM (сигналы в signals.py). Значение, закэшированное под ключом с
+поколениями моделей, перестаёт использоваться, как только любая из них
+меняется; устаревшие ключи удаляются кэшем по TTL. Вместе с поколением
+запоминается время записи - из него строится заголовок Last-Modified.
+
+Поколения и время записи хранятся в таблице ModelGeneration и читаются
+из неё одним запросом на запрос к API (get_states). Поэтому они
+одинаковы во всех процессах, не сбрасываются при перезапуске, а кэш, где
+лежат сами значения, может быть локальным для процесса.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ModelGeneration
+
+
+def create_states(models, using=DEFAULT_DB_ALIAS):
+    """Создаёт строки моделей, в которые ещё не писали."""
+    ModelGeneration.objects.using(using).bulk_create(
+        [ModelGeneration(model=model._meta.label_lower) for model in models],
+        ignore_conflicts=True,
+    )
+
+
+def load_states(models):
+    """Пары (поколение, время записи) всех моделей по метке модели.
+
+    Таблица маленькая, поэтому читаются все строки: поколения других
+    моделей пригодятся в том же запросе к API.
+    """
+    rows = list(ModelGeneration.objects.all())
+    labels = {row.model for row in rows}
+    if any(model._meta.label_lower not in labels for model in models):
+        create_states(models)
+        rows = list(ModelGeneration.objects.all())
+    return {
+        row.model: (row.generation, row.modified.timestamp()) for row in rows
+    }
+
+
+def get_states(models, request=None):
+    """Пары (поколение, время записи) моделей в порядке перечисления.
+
+    С request значения читаются из базы один раз за запрос: заголовки
+    ETag и Last-Modified, ключ кэша ответа и ключ кэша количества строятся
+    из одного состояния.
+    """
+    if request is None:
+        states = load_states(models)
+    else:
+        # Request DRF хранит исходный HttpRequest, который видят middleware.
+        request = getattr(request, '_request', request)
+        states = getattr(request, '_generation_states', {})
+        if any(model._meta.label_lower not in states for model in models):
+            states = load_states(models)
+            request._generation_states = states
+    return [states[model._meta.label_lower] for model in models]
+
+
+def get_generations(models, request=None):
+    """Текущие поколения моделей в порядке перечисления."""
+    return tuple(
+        generation for generation, _ in get_states(models, request)
+    )
+
+
+def get_modified(models, request=None):
+    """Время последней записи в любую из моделей, секунды от эпохи."""
+    return max(modified for _, modified in get_states(models, request))
+
+
+def bump_generation(model):
+    """Увеличивает поколение модели и запоминает время записи."""
+    label = model._meta.label_lower
+    rows = ModelGeneration.objects.filter(model=label)
+    changes = {'generation': F('generation') + 1, 'modified': timezone.now()}
+    if not rows.update(**changes):
+        ModelGeneration.objects.get_or_create(model=label)
+        rows.update(**changes)
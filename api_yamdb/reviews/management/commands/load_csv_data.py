@@ -1,7 +1,9 @@
 import csv
 import logging
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from reviews.generations import bump_generation
 from reviews.models import (
     Categories, Comment, Genre, Review, Title, GenreTitle, User
 )
@@ -54,4 +56,7 @@ class Command(BaseCommand):
                     csv_serializer(csv.DictReader(csv_file), model)
             except Exception as error:
                 CommandError(error)
+            bump_generation(model)
+        # bulk_create не вызывает сигналы, поэтому рейтинг пересчитываем.
+        call_command('rebuild_title_aggregates', stdout=self.stdout)
         logging.info('Successfully loaded all data into database')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовые индексы FTS5 по содержимому таблиц'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help='Таблицы, индексы которых нужно пересобрать '
+                 f'(по умолчанию все: {", ".join(search.SEARCH_INDEXES)})',
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite'
+            )
+        tables = options['tables'] or list(search.SEARCH_INDEXES)
+        unknown = set(tables) - set(search.SEARCH_INDEXES)
+        if unknown:
+            raise CommandError(
+                f'Нет полнотекстового индекса: {", ".join(sorted(unknown))}'
+            )
+        search.rebuild(tables)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобраны индексы: {", ".join(tables)}'
+        ))
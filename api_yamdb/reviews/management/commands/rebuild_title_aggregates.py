@@ -0,0 +1,166 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import (Count, Exists, F, OuterRef, Q, Subquery, Sum,
+                              Value)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from reviews.generations import bump_generation
+from reviews.models import (SCORES, Comment, Review, Title,
+                            score_count_field, weighted_rating)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def count_subquery(queryset):
+    """COUNT(*) строк queryset, сгруппированного по внешнему ключу."""
+    return Coalesce(
+        Subquery(queryset.annotate(total=Count('id')).values('total')), 0
+    )
+
+
+def title_aggregates():
+    """Выражения, вычисляющие денормализованные поля Title по отзывам."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    scores = reviews.filter(score__isnull=False)
+    aggregates = {
+        'rating_sum': Coalesce(
+            Subquery(scores.annotate(total=Sum('score')).values('total')), 0
+        ),
+        'rating_count': count_subquery(scores),
+        'review_count': count_subquery(reviews),
+    }
+    aggregates['weighted_rating'] = weighted_rating(
+        aggregates['rating_sum'],
+        aggregates['rating_count'],
+        Exists(scores),
+    )
+    for score in SCORES:
+        aggregates[score_count_field(score)] = count_subquery(
+            scores.filter(score=score)
+        )
+    return aggregates
+
+
+def review_aggregates():
+    """Выражения, вычисляющие денормализованные поля Review."""
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review')
+    return {'comment_count': count_subquery(comments)}
+
+
+# Модели с денормализованными полями и выражения для их расчёта.
+AGGREGATES = ((Title, title_aggregates), (Review, review_aggregates))
+
+
+def drifted_rows(queryset, aggregates):
+    """Строки, у которых сохранённые значения не совпадают с расчётом."""
+    annotations = {}
+    drift = Q()
+    for field, expression in aggregates().items():
+        # NULL в сравнении не равен ничему, поэтому заменяем его на -1.
+        missing = Value(-1, output_field=queryset.model._meta.get_field(field))
+        annotations[f'stored_{field}'] = Coalesce(F(field), missing)
+        annotations[f'expected_{field}'] = Coalesce(expression, missing)
+        drift |= ~Q(**{f'stored_{field}': F(f'expected_{field}')})
+    return queryset.annotate(**annotations).filter(drift)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг и счётчики отзывов произведений и счётчики '
+        'комментариев отзывов порциями, не блокируя базу надолго'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не записывая',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество записей в одной порции',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Пауза между порциями в секундах',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        messages = []
+        total_drifted = 0
+        for model, aggregates in AGGREGATES:
+            checked, drifted = self.rebuild(model, aggregates, options)
+            total_drifted += drifted
+            action = 'с расхождениями' if options['check'] else 'исправлено'
+            messages.append(
+                f'{model._meta.verbose_name_plural}: проверено {checked}, '
+                f'{action} {drifted}'
+            )
+        message = '; '.join(messages)
+        if options['check'] and total_drifted:
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def rebuild(self, model, aggregates, options):
+        """Проверяет или исправляет записи model; возвращает количество
+        проверенных и расходящихся записей."""
+        fields = list(aggregates())
+        checked = drifted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                model.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['chunk_size']]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+            with transaction.atomic():
+                stale = drifted_rows(
+                    model.objects.filter(pk__in=ids), aggregates
+                )
+                if options['check']:
+                    rows = stale.values('pk', *(
+                        f'{state}_{field}'
+                        for field in fields
+                        for state in ('stored', 'expected')
+                    ))
+                    for row in rows:
+                        drifted += 1
+                        self.stdout.write(
+                            self.format_drift(model, row, fields)
+                        )
+                else:
+                    drifted += model.objects.filter(
+                        pk__in=list(stale.values_list('pk', flat=True))
+                    ).update(**aggregates(), updated_at=timezone.now())
+            if options['pause']:
+                time.sleep(options['pause'])
+        if drifted and not options['check']:
+            # update() не отправляет сигналы: сбрасываем кэши сами.
+            bump_generation(model)
+        return checked, drifted
+
+    @staticmethod
+    def format_drift(model, row, fields):
+        changes = ', '.join(
+            f'{field}: {row[f"stored_{field}"]} -> '
+            f'{row[f"expected_{field}"]}'
+            for field in fields
+            if row[f'stored_{field}'] != row[f'expected_{field}']
+        )
+        return f'{model.__name__} {row["pk"]}: {changes}'
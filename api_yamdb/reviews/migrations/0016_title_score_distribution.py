@@ -0,0 +1,80 @@
+# Generated by Django 3.2 on 2026-10-17 11:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_score_distribution(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    buckets = {}
+    for score in range(1, 11):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'), score=score
+        ).order_by().values('title')
+        buckets[f'score_{score}_count'] = Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')), 0
+        )
+    Title.objects.update(**buckets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_title_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_score_distribution, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-17 11:44
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+
+
+# TOP_RATED_PRIOR_SCORE и TOP_RATED_PRIOR_VOTES на момент миграции:
+# результат миграции не должен зависеть от текущих настроек. Рейтинг по
+# изменённым настройкам пересчитывает rebuild_title_aggregates.
+PRIOR_SCORE = 6
+PRIOR_VOTES = 10
+
+
+def fill_weighted_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    prior_votes = PRIOR_VOTES
+    prior_sum = float(PRIOR_SCORE * prior_votes)
+    Title.objects.filter(rating_count__gt=0).update(
+        weighted_rating=(
+            (Value(prior_sum) + Cast(F('rating_sum'), FloatField()))
+            / (Value(prior_votes) + F('rating_count'))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating', '-id'], name='title_top_rated_idx'),
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating', '-id'], name='title_category_top_rated_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+from reviews import search
+
+SEARCH_INDEXES = {
+    'reviews_title': ('name', 'description'),
+    'reviews_categories': ('name',),
+    'reviews_genre': ('name',),
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    search.create_indexes(schema_editor, SEARCH_INDEXES)
+
+
+def drop_search_indexes(apps, schema_editor):
+    search.drop_indexes(schema_editor, SEARCH_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0018_api_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+from reviews import search
+
+SEARCH_INDEXES = {
+    'reviews_review': ('text',),
+    'reviews_comment': ('text',),
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    search.create_indexes(schema_editor, SEARCH_INDEXES)
+
+
+def drop_search_indexes(apps, schema_editor):
+    search.drop_indexes(schema_editor, SEARCH_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-17 12:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from reviews import search
+
+
+def count_by(model, field):
+    """Подзапрос: количество строк model, у которых field = OuterRef('pk')."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+# SQLite добавляет поле, пересоздавая таблицу, и триггеры FTS-индексов
+# (0019, 0020) удаляются вместе со старой таблицей.
+SEARCH_TRIGGERS = {
+    'reviews_title': ('name', 'description'),
+    'reviews_review': ('text',),
+}
+
+
+def create_search_triggers(apps, schema_editor):
+    search.create_triggers(schema_editor, SEARCH_TRIGGERS)
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    Title.objects.update(review_count=count_by(Review, 'title'))
+    Review.objects.update(comment_count=count_by(Comment, 'review'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0020_review_comment_search_index'),
+    ]
+
+    operations = [
+        # При откате триггеры восстанавливаются после удаления полей.
+        migrations.RunPython(
+            migrations.RunPython.noop, create_search_triggers
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.RunPython(
+            create_search_triggers, migrations.RunPython.noop
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-comment_count', '-id'], name='review_title_comments_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-review_count', '-id'], name='title_review_count_idx'),
+        ),
+    ]
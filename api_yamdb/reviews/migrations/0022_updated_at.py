@@ -0,0 +1,70 @@
+# Generated by Django 3.2 on 2026-10-17 12:41
+
+from django.db import migrations, models
+from django.db.models import F
+from reviews import search
+
+# SQLite добавляет поле, пересоздавая таблицу, и триггеры FTS-индексов
+# (0019, 0020) удаляются вместе со старой таблицей.
+SEARCH_TRIGGERS = {
+    'reviews_title': ('name', 'description'),
+    'reviews_categories': ('name',),
+    'reviews_genre': ('name',),
+    'reviews_review': ('text',),
+    'reviews_comment': ('text',),
+}
+
+
+def create_search_triggers(apps, schema_editor):
+    search.create_triggers(schema_editor, SEARCH_TRIGGERS)
+
+
+def fill_updated_at(apps, schema_editor):
+    # Отзывы и комментарии не менялись позже публикации, насколько известно.
+    for model_name in ('Review', 'Comment'):
+        apps.get_model('reviews', model_name).objects.update(
+            updated_at=F('pub_date')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0021_review_comment_counters'),
+    ]
+
+    operations = [
+        # При откате триггеры восстанавливаются после удаления полей.
+        migrations.RunPython(
+            migrations.RunPython.noop, create_search_triggers
+        ),
+        migrations.AddField(
+            model_name='categories',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(
+            create_search_triggers, migrations.RunPython.noop
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
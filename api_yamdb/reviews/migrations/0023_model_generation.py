@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-17 13:04
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0022_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelGeneration',
+            fields=[
+                ('model', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Модель')),
+                ('generation', models.PositiveBigIntegerField(default=0, verbose_name='Поколение')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время записи')),
+            ],
+            options={
+                'verbose_name': 'Поколение модели',
+                'verbose_name_plural': 'Поколения моделей',
+            },
+        ),
+    ]
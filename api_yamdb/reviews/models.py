@@ -1,18 +1,53 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Cast
 from django.utils import timezone
 
 User = get_user_model()
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+
+
+def score_count_field(score):
+    """Имя поля Title со счётчиком отзывов с оценкой score."""
+    return f'score_{score}_count'
+
+
+def weighted_rating(score_sum, score_count, rated):
+    """SQL-выражение байесовского рейтинга по сумме и количеству оценок.
+
+    rated - условие наличия оценок; у произведений без оценок рейтинг
+    NULL, и в список лучших они не попадают.
+    """
+    prior_votes = settings.TOP_RATED_PRIOR_VOTES
+    prior_sum = float(settings.TOP_RATED_PRIOR_SCORE * prior_votes)
+    return Case(
+        When(rated, then=(
+            (Value(prior_sum) + Cast(score_sum, FloatField()))
+            / (Value(prior_votes) + score_count)
+        )),
+        default=Value(None),
+        output_field=FloatField(),
+    )
+
 
 class Categories(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название')
     slug = models.SlugField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
         ordering = ['-id']
+        indexes = [models.Index(fields=['name'], name='%(class)s_name_idx')]
 
     def __str__(self):
         return self.name
@@ -21,17 +56,47 @@ class Categories(models.Model):
 class Genre(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название')
     slug = models.SlugField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
         ordering = ['-id']
+        indexes = [models.Index(fields=['name'], name='%(class)s_name_idx')]
 
     def __str__(self):
         return self.name
 
 
-class Title(models.Model):
+class AggregateFieldsModel(models.Model):
+    """Модель с денормализованными полями AGGREGATE_FIELDS.
+
+    Поля обновляются сигналами через UPDATE ... SET F(), поэтому обычное
+    сохранение объекта их не перезаписывает устаревшими значениями.
+    """
+    AGGREGATE_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(AggregateFieldsModel):
+    AGGREGATE_FIELDS = (
+        'rating_sum', 'rating_count', 'weighted_rating', 'review_count'
+    ) + tuple(score_count_field(score) for score in SCORES)
+
     name = models.CharField(max_length=256, verbose_name='Название')
     year = models.IntegerField(
         timezone.now().year
@@ -49,25 +114,107 @@ class Title(models.Model):
         verbose_name='Категория',
         null=True,
         blank=True,
+        # Покрывается составными индексами, начинающимися с category.
+        db_index=False,
     )
     genre = models.ManyToManyField(
         Genre, through='GenreTitle', related_name='genre')
+    rating_sum = models.IntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.IntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    weighted_rating = models.FloatField(
+        verbose_name='Взвешенный рейтинг',
+        null=True,
+        editable=False,
+    )
+    review_count = models.IntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    # Распределение оценок: количество отзывов с каждой оценкой.
+    score_1_count = models.IntegerField(default=0, editable=False)
+    score_2_count = models.IntegerField(default=0, editable=False)
+    score_3_count = models.IntegerField(default=0, editable=False)
+    score_4_count = models.IntegerField(default=0, editable=False)
+    score_5_count = models.IntegerField(default=0, editable=False)
+    score_6_count = models.IntegerField(default=0, editable=False)
+    score_7_count = models.IntegerField(default=0, editable=False)
+    score_8_count = models.IntegerField(default=0, editable=False)
+    score_9_count = models.IntegerField(default=0, editable=False)
+    score_10_count = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year', '-id'], name='title_year_idx'),
+            models.Index(
+                fields=['category', '-id'], name='title_category_idx'
+            ),
+            models.Index(
+                fields=['-weighted_rating', '-id'],
+                name='title_top_rated_idx',
+            ),
+            models.Index(
+                fields=['category', '-weighted_rating', '-id'],
+                name='title_category_top_rated_idx',
+            ),
+            models.Index(
+                fields=['-review_count', '-id'],
+                name='title_review_count_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка, округлённая вниз; None, если оценок нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @property
+    def rating_mean(self):
+        """Точная средняя оценка; None, если оценок нет."""
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def score_distribution(self):
+        """Количество отзывов с каждой оценкой от MIN_SCORE до MAX_SCORE."""
+        return {
+            score: getattr(self, score_count_field(score))
+            for score in SCORES
+        }
+
+
+class Review(AggregateFieldsModel):
+    AGGREGATE_FIELDS = ('comment_count',)
 
-class Review(models.Model):
     text = models.TextField(verbose_name='Текст отзыва')
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='reviews'
+        related_name='reviews',
+        # Покрывается ограничением unique_review_author.
+        db_index=False,
     )
     score = models.IntegerField(verbose_name='Оценка', null=True)
     pub_date = models.DateTimeField(
@@ -80,6 +227,16 @@ class Review(models.Model):
         related_name='reviews',
         blank=True,
         null=True,
+        db_index=False,
+    )
+    comment_count = models.IntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
     )
 
     class Meta:
@@ -91,6 +248,13 @@ class Review(models.Model):
                 name='unique_review_author'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', '-id'], name='review_title_idx'),
+            models.Index(
+                fields=['title', '-comment_count', '-id'],
+                name='review_title_comments_idx',
+            ),
+        ]
         ordering = ['-id']
 
     def __str__(self):
@@ -114,11 +278,19 @@ class Comment(models.Model):
         related_name='comments',
         blank=True,
         null=True,
+        db_index=False,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
     )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review', '-id'], name='comment_review_idx'),
+        ]
         ordering = ['-id']
 
     def __str__(self):
@@ -126,8 +298,39 @@ class Comment(models.Model):
 
 
 class GenreTitle(models.Model):
-    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
-    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, db_index=False)
+    title = models.ForeignKey(Title, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'genre'),
+                name='unique_genre_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.genre} {self.title}'
+
+
+class ModelGeneration(models.Model):
+    """Поколение модели и время последней записи в её таблицу.
+
+    Источник ETag и Last-Modified, общий для всех процессов и не
+    сбрасываемый при перезапуске; в кэше хранится копия (generations.py).
+    """
+    model = models.CharField('Модель', max_length=100, primary_key=True)
+    generation = models.PositiveBigIntegerField('Поколение', default=0)
+    modified = models.DateTimeField('Время записи', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Поколение модели'
+        verbose_name_plural = 'Поколения моделей'
+
+    def __str__(self):
+        return f'{self.model} {self.generation}'
@@ -0,0 +1,232 @@
+"""Полнотекстовый поиск на SQLite FTS5.
+
+Для каждой таблицы из SEARCH_INDEXES миграция создаёт виртуальную
+таблицу <таблица>_fts с внешним содержимым и триггеры, которые держат
+индекс в актуальном состоянии при любых INSERT/UPDATE/DELETE, в том
+числе при bulk_create. Пересобрать индекс можно командой
+rebuild_search_index.
+
+SQLite выполняет AddField и другие изменения таблицы, пересоздавая её,
+и триггеры удаляются вместе со старой таблицей. Миграции таких таблиц
+восстанавливают их через create_triggers(), а после каждого migrate
+restore_missing_triggers() пересоздаёт оставшиеся без триггеров индексы.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import (CharField, F, FloatField, IntegerField,
+                              TextField, Value)
+from django.db.models.expressions import RawSQL
+from reviews.models import Comment, Review
+
+SEARCH_INDEXES = {
+    'reviews_title': ('name', 'description'),
+    'reviews_categories': ('name',),
+    'reviews_genre': ('name',),
+    'reviews_review': ('text',),
+    'reviews_comment': ('text',),
+}
+
+TRIGGER_SUFFIXES = ('ai', 'ad', 'au')
+
+WORD = re.compile(r'\w+')
+# Границы найденных слов во фрагменте: управляющие символы не встречаются
+# в тексте, поэтому их можно безопасно заменить на разметку после
+# экранирования фрагмента.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 16
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def trigger_sql(table, columns):
+    """SQL триггеров, переносящих изменения таблицы в её FTS-индекс."""
+    index = fts_table(table)
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    delete = (
+        f"INSERT INTO {index}({index}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = f'INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new});'
+    return [
+        *(f'DROP TRIGGER IF EXISTS {index}_{suffix}'
+          for suffix in TRIGGER_SUFFIXES),
+        f'CREATE TRIGGER {index}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {index}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {index}_au AFTER UPDATE OF {names} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    ]
+
+
+def rebuild_sql(table):
+    index = fts_table(table)
+    return f"INSERT INTO {index}({index}) VALUES ('rebuild')"
+
+
+def create_index_sql(table, columns):
+    index = fts_table(table)
+    return [
+        f"CREATE VIRTUAL TABLE {index} USING fts5({', '.join(columns)}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        *trigger_sql(table, columns),
+        rebuild_sql(table),
+    ]
+
+
+def drop_index_sql(table):
+    index = fts_table(table)
+    return [
+        f'DROP TRIGGER IF EXISTS {index}_{suffix}'
+        for suffix in TRIGGER_SUFFIXES
+    ] + [f'DROP TABLE IF EXISTS {index}']
+
+
+def create_indexes(schema_editor, tables):
+    """Создаёт FTS-индексы tables ({таблица: колонки}) в миграции."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in tables.items():
+        for sql in create_index_sql(table, columns):
+            schema_editor.execute(sql)
+
+
+def drop_indexes(schema_editor, tables):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in tables:
+        for sql in drop_index_sql(table):
+            schema_editor.execute(sql)
+
+
+def create_triggers(schema_editor, tables):
+    """Пересоздаёт триггеры индексов tables после изменения таблиц."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in tables.items():
+        for sql in trigger_sql(table, columns):
+            schema_editor.execute(sql)
+
+
+def restore_missing_triggers(using=DEFAULT_DB_ALIAS):
+    """Восстанавливает триггеры существующих индексов, если их нет.
+
+    Такие индексы пересобираются: изменения таблицы без триггеров в них
+    не попали. Возвращает список восстановленных таблиц.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return []
+    restored = []
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        for table, columns in SEARCH_INDEXES.items():
+            index = fts_table(table)
+            if index not in existing or all(
+                f'{index}_{suffix}' in existing
+                for suffix in TRIGGER_SUFFIXES
+            ):
+                continue
+            for sql in trigger_sql(table, columns) + [rebuild_sql(table)]:
+                cursor.execute(sql)
+            restored.append(table)
+    return restored
+
+
+def fts_query(text):
+    """Запрос FTS5 из пользовательского ввода.
+
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    Кавычки и операторы FTS5 из ввода не передаются.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD.findall(text.lower()))
+
+
+def full_text_search(queryset, text, snippet=False):
+    """Отбирает записи queryset по FTS-индексу его таблицы.
+
+    Добавляет поле search_rank (чем меньше, тем релевантнее) и
+    упорядочивает по нему. С snippet=True добавляет поле search_snippet -
+    фрагмент первой колонки индекса, где найденные слова обрамлены
+    MATCH_START и MATCH_END.
+    """
+    query = fts_query(text)
+    if not query:
+        return queryset
+    table = queryset.model._meta.db_table
+    index = fts_table(table)
+    annotations = {
+        'search_rank': RawSQL(f'"{index}".rank', [], FloatField()),
+    }
+    if snippet:
+        annotations['search_snippet'] = RawSQL(
+            f'snippet("{index}", 0, %s, %s, %s, {SNIPPET_TOKENS})',
+            [MATCH_START, MATCH_END, SNIPPET_ELLIPSIS],
+            TextField(),
+        )
+    return queryset.extra(
+        tables=[index],
+        where=[f'"{index}".rowid = "{table}".id', f'"{index}" MATCH %s'],
+        params=[query],
+    ).annotate(**annotations).order_by('search_rank', '-id')
+
+
+def text_search(text):
+    """Отзывы и комментарии, содержащие все слова запроса.
+
+    Оба индекса опрашиваются одним запросом UNION ALL, общий результат
+    упорядочен по релевантности. Строки - словари с полями kind, object_id,
+    title_pk, review_pk, author_name, body, published, search_rank и
+    search_snippet.
+    """
+    if not fts_query(text):
+        return Review.objects.none().values()
+    reviews = full_text_search(Review.objects.all(), text, snippet=True)
+    reviews = reviews.order_by().values(
+        'search_rank',
+        'search_snippet',
+        kind=Value('review', output_field=CharField()),
+        object_id=F('id'),
+        title_pk=F('title_id'),
+        review_pk=Value(None, output_field=IntegerField()),
+        author_name=F('author__username'),
+        body=F('text'),
+        published=F('pub_date'),
+    )
+    comments = full_text_search(Comment.objects.all(), text, snippet=True)
+    comments = comments.order_by().values(
+        'search_rank',
+        'search_snippet',
+        kind=Value('comment', output_field=CharField()),
+        object_id=F('id'),
+        title_pk=F('review__title_id'),
+        review_pk=F('review_id'),
+        author_name=F('author__username'),
+        body=F('text'),
+        published=F('pub_date'),
+    )
+    return reviews.union(comments, all=True).order_by(
+        'search_rank', '-published'
+    )
+
+
+def rebuild(tables=None):
+    """Пересобирает FTS-индексы по текущему содержимому таблиц."""
+    with connection.cursor() as cursor:
+        for table in tables or SEARCH_INDEXES:
+            cursor.execute(rebuild_sql(table))
@@ -0,0 +1,235 @@
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import (CASCADE, DO_NOTHING, PROTECT, RESTRICT, F,
+                              Q)
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search
+from .generations import bump_generation, create_states
+from .models import (SCORES, Categories, Comment, Genre, GenreTitle,
+                     ModelGeneration, Review, Title, User, score_count_field,
+                     weighted_rating)
+
+# Модели, поколения которых используются в ключах кэша.
+GENERATION_MODELS = (
+    Categories, Genre, Title, GenreTitle, Review, Comment, User
+)
+
+
+def rating_deltas(previous, current):
+    """Считает изменения счётчиков отзывов и оценок по произведениям.
+
+    previous и current - пары (title_id, score) до и после изменения
+    отзыва либо None, если отзыва не было (создание) или не стало
+    (удаление). Возвращает {title_id: {поле Title: приращение}}.
+    """
+    deltas = defaultdict(Counter)
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        title_id, score = state
+        if title_id is None:
+            continue
+        fields = deltas[title_id]
+        fields['review_count'] += sign
+        if score is None:
+            continue
+        fields['rating_sum'] += sign * score
+        fields['rating_count'] += sign
+        if score in SCORES:
+            fields[score_count_field(score)] += sign
+    return deltas
+
+
+def update_title_rating(previous, current):
+    """Атомарно применяет изменения отзывов к счётчикам произведений."""
+    for title_id, fields in rating_deltas(previous, current).items():
+        changes = {
+            field: F(field) + delta
+            for field, delta in fields.items() if delta
+        }
+        if not changes:
+            continue
+        count_delta = fields['rating_count']
+        changes['weighted_rating'] = weighted_rating(
+            F('rating_sum') + fields['rating_sum'],
+            F('rating_count') + count_delta,
+            Q(rating_count__gt=-count_delta),
+        )
+        # Рейтинг и счётчик отзывов входят в представление произведения.
+        changes['updated_at'] = timezone.now()
+        Title.objects.filter(pk=title_id).update(**changes)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """Запоминает сохранённую в базе оценку редактируемого отзыва."""
+    instance._rating_previous = None
+    if raw or instance.pk is None:
+        return
+    reviews = Review.objects.filter(pk=instance.pk)
+    if transaction.get_connection().in_atomic_block:
+        reviews = reviews.select_for_update()
+    instance._rating_previous = reviews.values_list(
+        'title_id', 'score'
+    ).first()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    update_title_rating(
+        getattr(instance, '_rating_previous', None),
+        (instance.title_id, instance.score),
+    )
+    instance._rating_previous = None
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating((instance.title_id, instance.score), None)
+
+
+def update_comment_count(review_id, delta):
+    if review_id is not None:
+        Review.objects.filter(pk=review_id).update(
+            comment_count=F('comment_count') + delta, updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_comment_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    update_comment_count(instance.review_id, -1)
+
+
+def bump_saved_generation(sender, **kwargs):
+    transaction.on_commit(lambda: bump_generation(sender))
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields, **kwargs):
+    """Отмечает, меняет ли сохранение имя пользователя.
+
+    Из пользователя в кэшируемых ответах есть только имя автора отзывов
+    и комментариев, поэтому вход, смена роли или биографии поколение
+    пользователей не меняют.
+    """
+    instance._username_changed = raw
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    previous = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance._username_changed = previous != instance.username
+
+
+def bump_user_generation(sender, instance, **kwargs):
+    if getattr(instance, '_username_changed', True):
+        transaction.on_commit(lambda: bump_generation(User))
+    instance._username_changed = False
+
+
+def deleted_models(model):
+    """Модели, строки которых меняет удаление строки model: сама модель и
+    модели, ссылающиеся на неё с CASCADE, SET_NULL, SET_DEFAULT или SET(),
+    для CASCADE - рекурсивно."""
+    changed, cascaded = {model}, {model}
+    pending = [model]
+    while pending:
+        for relation in pending.pop()._meta.related_objects:
+            if relation.many_to_many or relation.on_delete in (
+                DO_NOTHING, PROTECT, RESTRICT
+            ):
+                continue
+            related = relation.related_model
+            changed.add(related)
+            if relation.on_delete is CASCADE and related not in cascaded:
+                cascaded.add(related)
+                pending.append(related)
+    return changed
+
+
+# Поколения, которые меняет удаление строки модели. Каскад выполняется
+# частично без сигналов (связи жанров, SET_NULL у категории), поэтому
+# затронутые модели определяются по связям.
+DELETED_GENERATIONS = {
+    model: tuple(
+        related for related in GENERATION_MODELS
+        if related in deleted_models(model)
+    )
+    for model in GENERATION_MODELS
+}
+
+
+def bump_deleted_generation(sender, **kwargs):
+    def bump_deleted():
+        for model in DELETED_GENERATIONS[sender]:
+            bump_generation(model)
+    transaction.on_commit(bump_deleted)
+
+
+def bump_genre_titles_generation(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(lambda: bump_generation(GenreTitle))
+
+
+for model in GENERATION_MODELS:
+    post_save.connect(
+        bump_user_generation if model is User else bump_saved_generation,
+        sender=model,
+        dispatch_uid=f'bump_saved_generation_{model._meta.label_lower}',
+    )
+    if model is not GenreTitle:
+        # Связи жанров удаляются каскадом или через m2m_changed; сигнал
+        # post_delete отключил бы для них быстрое удаление.
+        post_delete.connect(
+            bump_deleted_generation, sender=model,
+            dispatch_uid=f'bump_deleted_generation_{model._meta.label_lower}',
+        )
+m2m_changed.connect(
+    bump_genre_titles_generation, sender=Title.genre.through,
+    dispatch_uid='bump_genre_titles_generation',
+)
+
+
+def create_generations(sender, using, **kwargs):
+    # Строки поколений создаются заранее: иначе первый запрос после записи
+    # в одну модель читал бы из базы поколения остальных. После отката
+    # миграций таблицы поколений может не быть.
+    if ModelGeneration._meta.db_table in (
+        connections[using].introspection.table_names()
+    ):
+        create_states(GENERATION_MODELS, using)
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    # Миграции, пересоздающие таблицы на SQLite, удаляют триггеры FTS.
+    # Пересобранный индекс меняет результаты поиска.
+    restored = search.restore_missing_triggers(using)
+    for model in GENERATION_MODELS:
+        if model._meta.db_table in restored:
+            bump_generation(model)
+
+
+post_migrate.connect(
+    create_generations, sender=apps.get_app_config('reviews'),
+    dispatch_uid='create_generations',
+)
+post_migrate.connect(
+    restore_search_triggers, sender=apps.get_app_config('reviews'),
+    dispatch_uid='restore_search_triggers',
+)
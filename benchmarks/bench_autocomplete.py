@@ -0,0 +1,80 @@
+"""Время ответа индекса автодополнения названий произведений.
+
+Заполняет индекс в памяти синтетическими названиями, без базы данных,
+и измеряет медианное и худшее время поиска для типичных запросов:
+короткий префикс, слово целиком, слово с опечаткой и несколько слов.
+
+    python benchmarks/bench_autocomplete.py --titles 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+LETTERS = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=200000)
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    return parser.parse_args()
+
+
+def typo(word, rnd):
+    position = rnd.randrange(1, len(word))
+    return word[:position] + rnd.choice(LETTERS) + word[position + 1:]
+
+
+def main():
+    args = parse_args()
+    django.setup()
+    from reviews.autocomplete import TitleAutocompleteIndex
+
+    rnd = random.Random(0)
+    words = [
+        ''.join(rnd.choice(LETTERS) for _ in range(rnd.randint(3, 10)))
+        for _ in range(args.words)
+    ]
+    index = TitleAutocompleteIndex()
+    start = time.perf_counter()
+    for pk in range(1, args.titles + 1):
+        index._add(pk, ' '.join(rnd.sample(words, rnd.randint(1, 4))).title())
+    # Индекс построен без базы: поиск с тем же поколением его не пересобирает.
+    index.loaded, index.generation = True, 0
+    print(f'Индекс построен за {time.perf_counter() - start:.1f} с')
+
+    kinds = {
+        'префикс 1 буква': lambda word: word[:1],
+        'префикс 3 буквы': lambda word: word[:3],
+        'слово целиком': lambda word: word,
+        'опечатка': lambda word: typo(word, rnd),
+        'два слова': lambda word: f'{word} {rnd.choice(words)[:2]}',
+    }
+    print(f'{"запрос":<18} {"медиана":>10} {"максимум":>10}')
+    for name, make_query in kinds.items():
+        timings = []
+        for _ in range(args.queries):
+            query = make_query(rnd.choice(words))
+            start = time.perf_counter()
+            index.search(query, args.limit, generation=0)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f'{name:<18} {statistics.median(timings):>7.2f} ms '
+            f'{max(timings):>7.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
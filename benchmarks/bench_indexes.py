@@ -0,0 +1,211 @@
+"""Планы и время запросов API до и после миграции с индексами.
+
+Создаёт временную SQLite-базу, применяет миграции до 0017, заполняет её
+синтетическими данными и измеряет запросы, которые выполняют эндпоинты
+API. Затем применяет 0018_api_access_path_indexes и повторяет замеры.
+
+    python benchmarks/bench_indexes.py --titles 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db.models import Exists, OuterRef  # noqa: E402
+
+BEFORE = ('reviews', '0017_title_weighted_rating')
+AFTER = ('reviews', '0018_api_access_path_indexes')
+BATCH_SIZE = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--reviews-per-title', type=int, default=10)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--genres-per-title', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=50)
+    return parser.parse_args()
+
+
+def migrate(executor, target):
+    executor.loader.build_graph()
+    executor.migrate([target])
+    return executor.loader.project_state(target).apps
+
+
+def fill(apps, args):
+    User = apps.get_model('users', 'User')
+    Categories = apps.get_model('reviews', 'Categories')
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    rnd = random.Random(0)
+
+    users_count = args.reviews_per_title * 10
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(users_count)
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+    Categories.objects.bulk_create(
+        Categories(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(20)
+    )
+    category_ids = list(Categories.objects.values_list('id', flat=True))
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(50)
+    )
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    Title.objects.bulk_create((
+        Title(
+            name=f'Произведение {i}',
+            year=rnd.randint(1900, 2023),
+            category_id=rnd.choice(category_ids),
+        )
+        for i in range(args.titles)
+    ), batch_size=BATCH_SIZE)
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    GenreTitle.objects.bulk_create((
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rnd.sample(genre_ids, args.genres_per_title)
+    ), batch_size=BATCH_SIZE)
+    Review.objects.bulk_create((
+        Review(
+            title_id=title_id,
+            author_id=author_id,
+            text='Текст отзыва',
+            score=rnd.randint(1, 10),
+        )
+        for title_id in title_ids
+        for author_id in rnd.sample(user_ids, args.reviews_per_title)
+    ), batch_size=BATCH_SIZE)
+    review_ids = list(Review.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create((
+        Comment(
+            review_id=review_id,
+            author_id=rnd.choice(user_ids),
+            text='Текст комментария',
+        )
+        for review_id in review_ids
+        for _ in range(args.comments_per_review)
+    ), batch_size=BATCH_SIZE)
+
+
+def access_paths(apps):
+    """Запросы эндпоинтов API: имя -> QuerySet."""
+    Categories = apps.get_model('reviews', 'Categories')
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    title = Title.objects.order_by('?').first()
+    review = Review.objects.filter(title=title).first()
+    page = list(Title.objects.order_by('-id').values_list('id', flat=True)[:5])
+    return {
+        'titles?year=': Title.objects.filter(
+            year=title.year
+        ).order_by('-id')[:5],
+        'titles?name=': Title.objects.filter(
+            name=title.name
+        ).order_by('-id')[:5],
+        'titles?category=': Title.objects.filter(
+            category__slug='category-3'
+        ).order_by('-id')[:5],
+        'titles?genre=': Title.objects.filter(
+            genre__slug='genre-7'
+        ).order_by('-id')[:5],
+        'titles?genre= (EXISTS)': Title.objects.filter(Exists(
+            GenreTitle.objects.filter(
+                title=OuterRef('pk'),
+                genre__in=Genre.objects.filter(slug='genre-7'),
+            )
+        )).order_by('-id')[:5],
+        'titles: genre prefetch': GenreTitle.objects.filter(
+            title_id__in=page
+        ).select_related('genre'),
+        'titles/top?category=': Title.objects.filter(
+            category_id=title.category_id, weighted_rating__isnull=False
+        ).order_by('-weighted_rating', '-id')[:10],
+        'reviews: page': Review.objects.filter(
+            title=title
+        ).order_by('-id')[:5],
+        'comments: page': Comment.objects.filter(
+            review=review
+        ).order_by('-id')[:5],
+        'categories?name=': Categories.objects.filter(name='Категория 7'),
+        'genres?name=': Genre.objects.filter(name='Жанр 7'),
+    }
+
+
+def measure(connection, queryset, repeat):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = ' | '.join(row[-1] for row in cursor.fetchall())
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+    return plan, statistics.median(timings)
+
+
+def report(label, results):
+    print(f'\n== {label}')
+    for name, (plan, elapsed) in results.items():
+        print(f'{name:<24} {elapsed:>9.3f} ms  {plan}')
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        settings.DATABASES['default']['NAME'] = Path(directory) / 'bench.db'
+        django.setup()
+        from django.db import connection
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connection)
+        apps = migrate(executor, BEFORE)
+        start = time.perf_counter()
+        fill(apps, args)
+        print(f'Данные созданы за {time.perf_counter() - start:.1f} с')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        paths = access_paths(apps)
+        before = {
+            name: measure(connection, queryset, args.repeat)
+            for name, queryset in paths.items()
+        }
+
+        apps = migrate(executor, AFTER)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        after = {
+            name: measure(connection, queryset, args.repeat)
+            for name, queryset in paths.items()
+        }
+        report(f'До миграции {AFTER[1]}', before)
+        report(f'После миграции {AFTER[1]}', after)
+        print('\nУскорение (медиана):')
+        for name in paths:
+            print(f'{name:<24} x{before[name][1] / after[name][1]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Время и пиковая память рендеринга JSON-ответов API.
+
+Сравнивает JSONRenderer DRF, FastJSONRenderer без orjson и с ним, а также
+потоковый FastJSONRenderer.iter_render на списках, которые планы чтения
+api/readers.py отдают для произведений и отзывов. База данных не нужна.
+
+    python benchmarks/bench_renderers.py --rows 20000
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.renderers import FastJSONRenderer, orjson  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser.parse_args()
+
+
+def titles(rows, rnd):
+    genres = [
+        {'name': f'Жанр {i}', 'slug': f'genre-{i}'} for i in range(50)
+    ]
+    return [
+        {
+            'id': i,
+            'name': f'Произведение {i}',
+            'year': rnd.randint(1900, 2023),
+            'rating': rnd.choice((None, rnd.randint(1, 10))),
+            'description': 'Описание произведения ' * 5,
+            'genre': rnd.sample(genres, 3),
+            'category': {'name': 'Фильмы', 'slug': 'movie'},
+        }
+        for i in range(rows)
+    ]
+
+
+def reviews(rows, rnd):
+    start = datetime.datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            'id': i,
+            'text': 'Текст отзыва ' * 10,
+            'author': f'user{rnd.randrange(1000)}',
+            'score': rnd.randint(1, 10),
+            'pub_date': start + datetime.timedelta(
+                seconds=rnd.randrange(10 ** 8),
+                microseconds=rnd.randrange(10 ** 6),
+            ),
+        }
+        for i in range(rows)
+    ]
+
+
+def fallback_renderer():
+    renderer = FastJSONRenderer()
+    renderer.use_orjson = False
+    return renderer
+
+
+def renderers():
+    """Имя -> функция, отдающая ответ целиком или по частям."""
+    result = {
+        'JSONRenderer': lambda data: [JSONRenderer().render(data)],
+        'Fast (json)': lambda data: [fallback_renderer().render(data)],
+    }
+    if orjson is not None:
+        result['Fast (orjson)'] = lambda data: [
+            FastJSONRenderer().render(data)
+        ]
+        result['Fast (orjson) stream'] = FastJSONRenderer().iter_render
+    return result
+
+
+def consume(chunks):
+    """Перебирает части ответа, как сервер, не копя их; возвращает размер."""
+    return sum(len(chunk) for chunk in chunks)
+
+
+def measure(render, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = consume(render(data))
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    consume(render(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2 ** 20, size / 2 ** 20
+
+
+def main():
+    args = parse_args()
+    rnd = random.Random(0)
+    payloads = {
+        'titles': titles(args.rows, rnd),
+        'reviews': reviews(args.rows, rnd),
+    }
+    if orjson is None:
+        print('orjson не установлен: замеры только для стандартного json')
+    for payload, data in payloads.items():
+        print(f'\n== {payload}: {args.rows} строк')
+        print(f'{"":<22} {"время":>10} {"пик памяти":>12} {"ответ":>10}')
+        for name, render in renderers().items():
+            elapsed, peak, size = measure(render, data, args.repeat)
+            print(
+                f'{name:<22} {elapsed:>7.1f} ms {peak:>9.1f} MiB '
+                f'{size:>6.1f} MiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
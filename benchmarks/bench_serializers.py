@@ -0,0 +1,163 @@
+"""Сериализаторы DRF против планов чтения из api.readers на 10k строк.
+
+Создаёт временную SQLite-базу со всеми миграциями, заполняет её
+синтетическими произведениями, отзывами и комментариями и сравнивает
+время выборки, сериализации и JSONRenderer для обоих путей. Заодно
+проверяет, что JSON совпадает байт в байт.
+
+    python benchmarks/bench_serializers.py --rows 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+BATCH_SIZE = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser.parse_args()
+
+
+def fill(rows):
+    from reviews.models import (Categories, Comment, Genre, GenreTitle,
+                                Review, Title, User)
+    rnd = random.Random(0)
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(100)
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+    Categories.objects.bulk_create(
+        Categories(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(20)
+    )
+    category_ids = list(Categories.objects.values_list('id', flat=True))
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(50)
+    )
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    Title.objects.bulk_create((
+        Title(
+            name=f'Произведение {i}',
+            year=rnd.randint(1900, 2023),
+            description='Описание произведения',
+            category_id=rnd.choice(category_ids),
+            rating_sum=rnd.randint(10, 100),
+            rating_count=10,
+        )
+        for i in range(rows)
+    ), batch_size=BATCH_SIZE)
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    GenreTitle.objects.bulk_create((
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rnd.sample(genre_ids, 3)
+    ), batch_size=BATCH_SIZE)
+    # Все отзывы - к одному произведению, все комментарии - к одному
+    # отзыву: так списки из rows строк получаются у каждого эндпоинта.
+    title_id = title_ids[0]
+    User.objects.bulk_create((
+        User(username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake')
+        for i in range(rows)
+    ), batch_size=BATCH_SIZE)
+    reviewer_ids = User.objects.filter(
+        username__startswith='reviewer'
+    ).values_list('id', flat=True)
+    Review.objects.bulk_create((
+        Review(
+            title_id=title_id,
+            author_id=author_id,
+            text='Текст отзыва',
+            score=rnd.randint(1, 10),
+        )
+        for author_id in reviewer_ids
+    ), batch_size=BATCH_SIZE)
+    review_id = Review.objects.values_list('id', flat=True).first()
+    Comment.objects.bulk_create((
+        Comment(
+            review_id=review_id,
+            author_id=rnd.choice(user_ids),
+            text='Текст комментария',
+        )
+        for _ in range(rows)
+    ), batch_size=BATCH_SIZE)
+    return title_id, review_id
+
+
+def timed(function, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        settings.DATABASES['default']['NAME'] = Path(directory) / 'bench.db'
+        django.setup()
+        from api.readers import (COMMENT_READ_PLAN, REVIEW_READ_PLAN,
+                                 TITLE_READ_PLAN)
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitlesReadSerializer)
+        from django.core.management import call_command
+        from reviews.models import Comment, Review, Title
+        from rest_framework.renderers import JSONRenderer
+
+        call_command('migrate', verbosity=0)
+        title_id, review_id = fill(args.rows)
+        renderer = JSONRenderer()
+        cases = {
+            'titles': (
+                TitlesReadSerializer, TITLE_READ_PLAN,
+                Title.objects.order_by('-id').select_related(
+                    'category'
+                ).prefetch_related('genre'),
+            ),
+            'reviews': (
+                ReviewSerializer, REVIEW_READ_PLAN,
+                Review.objects.filter(title_id=title_id).select_related(
+                    'author'
+                ),
+            ),
+            'comments': (
+                CommentSerializer, COMMENT_READ_PLAN,
+                Comment.objects.filter(review_id=review_id).select_related(
+                    'author'
+                ),
+            ),
+        }
+        print(f'{"":<10} {"сериализатор":>14} {"план":>10} {"ускорение":>10}')
+        for name, (serializer_class, plan, queryset) in cases.items():
+            slow, expected = timed(lambda: renderer.render(
+                serializer_class(queryset.all(), many=True).data
+            ), args.repeat)
+            fast, actual = timed(lambda: renderer.render(
+                plan.render(plan.values(queryset.all()))
+            ), args.repeat)
+            assert actual == expected, f'{name}: JSON различается'
+            print(
+                f'{name:<10} {slow:>11.1f} ms {fast:>7.1f} ms '
+                f'{slow / fast:>9.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
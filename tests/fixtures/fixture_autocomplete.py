@@ -0,0 +1,10 @@
+import pytest
+from reviews.autocomplete import title_index
+
+
+@pytest.fixture(autouse=True)
+def clear_title_index():
+    # Индекс живёт в памяти процесса, а база очищается между тестами.
+    title_index.clear()
+    yield
+    title_index.clear()
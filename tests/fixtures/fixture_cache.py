@@ -0,0 +1,14 @@
+import pytest
+from api.middleware import reset_response_cache_stats
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кэш и счётчики кэша ответов живут в памяти процесса, а база
+    # очищается между тестами.
+    cache.clear()
+    reset_response_cache_stats()
+    yield
+    cache.clear()
+    reset_response_cache_stats()
@@ -0,0 +1,172 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Title
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        return client.get(f'/api/v1/titles/{title_id}/').json()['rating']
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        review = create_single_review(user_client, title_id, 'Хорошо', 6)
+        create_single_review(moderator_client, title_id, 'Отлично', 9)
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(
+            f'{url}{review.json()["id"]}/', data={'score': 1}
+        )
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        moderator_client.delete(f'{url}{review.json()["id"]}/')
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None, (
+            'Отзывы не должны влиять на рейтинг других произведений.'
+        )
+
+    def test_02_rating_after_author_deleted(self, client, admin_client,
+                                            user, user_client,
+                                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Плохо', 2)
+        create_single_review(moderator_client, title_id, 'Неплохо', 8)
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что при удалении пользователя его оценки '
+            'исключаются из рейтинга произведений.'
+        )
+
+    def test_03_rebuild_command(self, client, admin_client, user_client,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Хорошо', 6)
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_title_aggregates', '--check',
+                         stdout=StringIO())
+        assert self.get_rating(client, title_id) is None, (
+            'Режим `--check` не должен изменять данные.'
+        )
+
+        call_command('rebuild_title_aggregates', '--chunk-size', '1',
+                     stdout=StringIO())
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что команда `rebuild_title_aggregates` '
+            'пересчитывает рейтинг произведений по отзывам.'
+        )
+        call_command('rebuild_title_aggregates', '--check',
+                     stdout=StringIO())
+
+    def test_04_title_stats(self, client, admin_client, user_client,
+                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/stats/'
+        create_single_review(user_client, title_id, 'Хорошо', 6)
+        review = create_single_review(
+            moderator_client, title_id, 'Отлично', 9
+        )
+        moderator_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+            data={'score': 10}
+        )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'6': 1, '10': 1})
+        assert data['distribution'] == expected, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'распределение оценок в поле `distribution`.'
+        )
+        assert data['count'] == 2 and data['mean'] == 8, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'количество отзывов и среднюю оценку.'
+        )
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/stats/')
+        assert response.json()['mean'] is None, (
+            'Если отзывов о произведении нет - значением поля `mean` '
+            'должно быть `None`.'
+        )
+
+    def test_05_top_rated(self, client, admin_client, user_client,
+                          moderator_client, admin):
+        titles, categories, _ = create_titles(admin_client)
+        url = '/api/v1/titles/top/'
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 10)
+        for author_client in (user_client, moderator_client, admin_client):
+            create_single_review(
+                author_client, titles[1]['id'], 'Отлично', 9
+            )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 200.'
+        )
+        ranking = [title['id'] for title in response.json()]
+        assert ranking == [titles[1]['id'], titles[0]['id']], (
+            f'Проверьте, что `{url}` упорядочивает произведения по '
+            'взвешенному рейтингу: единственная высокая оценка не должна '
+            'выводить произведение на первое место.'
+        )
+
+        response = client.get(f'{url}?category={categories[0]["slug"]}')
+        assert [title['id'] for title in response.json()] == [
+            titles[0]['id']
+        ], f'Проверьте, что `{url}` фильтрует произведения по категории.'
+
+        response = client.get(f'{url}?limit=1')
+        assert len(response.json()) == 1, (
+            f'Проверьте, что `{url}` учитывает параметр `limit`.'
+        )
+        response = client.get(f'{url}?limit=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        call_command('rebuild_title_aggregates', '--check',
+                     stdout=StringIO())
+
+    def test_06_prior_changed(self, admin_client, user_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 10)
+        settings.TOP_RATED_PRIOR_VOTES = 2
+        with pytest.raises(CommandError):
+            call_command('rebuild_title_aggregates', '--check',
+                         stdout=StringIO())
+        call_command('rebuild_title_aggregates', stdout=StringIO())
+        assert Title.objects.get(id=titles[0]['id']).weighted_rating == (
+            pytest.approx((6 * 2 + 10) / 3)
+        ), (
+            'Проверьте, что `rebuild_title_aggregates` пересчитывает '
+            'взвешенный рейтинг по текущим настройкам.'
+        )
@@ -0,0 +1,175 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from api.permissions import IsAuthorIsModeratorIsAdminOrReadOnly
+from reviews.models import Review, User
+
+from tests.utils import (create_comments, create_genre, create_reviews,
+                         create_single_review, create_titles)
+
+
+def create_more_titles(admin_client, count):
+    genres = [genre['slug'] for genre in create_genre(admin_client)]
+    admin_client.post('/api/v1/categories/', data={
+        'name': 'Музыка', 'slug': 'music'
+    })
+    for idx in range(count):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': f'Произведение {idx}',
+            'year': 2000,
+            'genre': genres,
+            'category': 'music',
+        })
+        assert response.status_code == HTTPStatus.CREATED
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+    # Запросы к маршрутам из RESPONSE_CACHE['ROUTES'] начинаются с чтения
+    # поколений моделей в middleware кэша.
+
+    def check_queries(self, django_assert_num_queries, client, url,
+                      expected):
+        with django_assert_num_queries(expected, info=(
+            f'Проверьте количество SQL-запросов при GET-запросе к `{url}`.'
+        )):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'GET-запрос к `{url}` должен вернуть ответ со статусом 200.'
+        )
+
+    @pytest.mark.parametrize('titles_count', (1, 5))
+    def test_01_titles(self, client, admin_client, django_assert_num_queries,
+                       titles_count):
+        create_more_titles(admin_client, titles_count)
+        title_id = client.get('/api/v1/titles/').json()['results'][0]['id']
+        create_single_review(admin_client, title_id, 'Отзыв', 7)
+
+        # Поколения, COUNT, произведения с категориями, жанры одним
+        # запросом.
+        self.check_queries(
+            django_assert_num_queries, client,
+            '/api/v1/titles/?exact_count=true', 4
+        )
+        self.check_queries(
+            django_assert_num_queries, client,
+            '/api/v1/titles/?genre=horror&category=music', 4
+        )
+        # Количество уже в кэше: отзыв на него не влияет.
+        self.check_queries(
+            django_assert_num_queries, client, '/api/v1/titles/', 3
+        )
+        self.check_queries(
+            django_assert_num_queries, client,
+            f'/api/v1/titles/{title_id}/', 3
+        )
+        self.check_queries(
+            django_assert_num_queries, client,
+            f'/api/v1/titles/{title_id}/stats/', 2
+        )
+        self.check_queries(
+            django_assert_num_queries, client, '/api/v1/titles/top/', 3
+        )
+
+    def test_02_categories_and_genres(self, client, admin_client,
+                                      django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/categories/', '/api/v1/genres/',
+                    '/api/v1/categories/?search=Фильм',
+                    '/api/v1/genres/?search=Драма'):
+            self.check_queries(django_assert_num_queries, client, url, 3)
+
+    def test_03_reviews(self, client, admin_client, admin, user, user_client,
+                        moderator, moderator_client,
+                        django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Поколения, COUNT и отзывы вместе с авторами.
+        self.check_queries(django_assert_num_queries, client, url, 3)
+        self.check_queries(
+            django_assert_num_queries, client, f'{url}{reviews[0]["id"]}/', 2
+        )
+        # Для пустой страницы проверяется, что произведение существует.
+        self.check_queries(
+            django_assert_num_queries, client,
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/', 3
+        )
+
+    def test_04_comments(self, client, admin_client, admin, user,
+                         user_client, moderator, moderator_client,
+                         django_assert_num_queries):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        self.check_queries(django_assert_num_queries, client, url, 3)
+        self.check_queries(
+            django_assert_num_queries, client,
+            f'{url}{comments[0]["id"]}/', 2
+        )
+        self.check_queries(
+            django_assert_num_queries, client,
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[1]["id"]}/comments/', 3
+        )
+
+    def test_05_missing_parents(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        for url in (
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/0/comments/',
+        ):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                f'GET-запрос к `{url}` должен вернуть ответ со статусом 404.'
+            )
+
+    def test_06_users(self, admin_client, user, moderator,
+                      django_assert_num_queries):
+        # Первый запрос каждого GET - пользователь из JWT-токена.
+        self.check_queries(
+            django_assert_num_queries, admin_client, '/api/v1/users/', 3
+        )
+        self.check_queries(
+            django_assert_num_queries, admin_client,
+            '/api/v1/users/?search=TestUser', 3
+        )
+        self.check_queries(
+            django_assert_num_queries, admin_client,
+            f'/api/v1/users/{user.username}/', 2
+        )
+        self.check_queries(
+            django_assert_num_queries, admin_client, '/api/v1/users/me/', 2
+        )
+
+    def test_07_object_permissions(self, admin_client, admin, user, moderator,
+                                   user_client, django_assert_num_queries):
+        reviews, _ = create_reviews(admin_client, {user: user_client})
+        review = Review.objects.get(pk=reviews[0]['id'])
+        permission = IsAuthorIsModeratorIsAdminOrReadOnly()
+        expected = {admin: True, moderator: True, user: True}
+        stranger = User.objects.create_user(
+            username='Stranger', email='stranger@yamdb.fake'
+        )
+        expected[stranger] = False
+        for request_user, allowed in expected.items():
+            request = SimpleNamespace(method='PATCH', user=request_user)
+            with django_assert_num_queries(0, info=(
+                'Проверка прав на объект не должна обращаться к базе.'
+            )):
+                assert permission.has_object_permission(
+                    request, None, review
+                ) is allowed
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from api.middleware import QueryRecorder, fingerprint
+from api_yamdb.settings import QUERY_BUDGET
+
+from tests.utils import (create_comments, create_single_review,
+                         create_titles)
+
+MIDDLEWARE = 'api.middleware.QueryBudgetMiddleware'
+
+
+@pytest.fixture
+def query_budget(settings):
+    # Как в settings.py: перед middleware кэша, чтобы учитывать чтение
+    # поколений моделей.
+    middleware = list(settings.MIDDLEWARE)
+    middleware.insert(
+        middleware.index('api.middleware.ConditionalGetMiddleware'),
+        MIDDLEWARE,
+    )
+    settings.MIDDLEWARE = middleware
+    settings.QUERY_BUDGET = {
+        'ROUTES': {'api:titles-list': 4},
+        'ACTION': 'header',
+    }
+    return settings
+
+
+class Test10QueryBudget:
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = \'x\''
+            ' LIMIT 21'
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?', (
+            'Проверьте, что литералы и списки параметров заменяются в '
+            'шаблоне запроса.'
+        )
+        assert fingerprint('SELECT "score_1_count" FROM t') == (
+            'SELECT "score_1_count" FROM t'
+        ), 'Цифры в именах полей не должны заменяться.'
+
+    def test_02_repeated_queries(self):
+        recorder = QueryRecorder()
+        for pk in range(3):
+            recorder(lambda *args: None,
+                     f'SELECT * FROM users_user WHERE id = {pk}',
+                     None, False, {})
+        recorder(lambda *args: None, 'SELECT 1', None, False, {})
+        assert recorder.repeated(3) == {
+            'SELECT * FROM users_user WHERE id = ?': 3
+        }, 'Проверьте, что повторяющиеся шаблоны запросов обнаруживаются.'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_header(self, query_budget, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert response['X-Query-Count'] == '4', (
+            'Проверьте, что в режиме `header` ответ содержит количество '
+            'SQL-запросов в заголовке `X-Query-Count`.'
+        )
+        assert response['X-Query-Budget'] == '4'
+        assert 'X-Query-Count' not in client.get('/redoc/'), (
+            'Запросы вне `/api/` не должны учитываться.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_raise_in_debug(self, query_budget, admin_client, client):
+        create_titles(admin_client)
+        query_budget.DEBUG = True
+        query_budget.QUERY_BUDGET = {
+            'ROUTES': {'api:titles-list': 1},
+            'ACTION': 'raise',
+        }
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR, (
+            'Проверьте, что в режиме `raise` при DEBUG превышение бюджета '
+            'возвращает ответ со статусом 500.'
+        )
+        assert response.json()['count'] == 4
+
+        query_budget.DEBUG = False
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Без DEBUG превышение бюджета должно только логироваться.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_shipped_budgets(self, query_budget, client, admin_client,
+                                admin, user_client, user):
+        query_budget.QUERY_BUDGET = {**QUERY_BUDGET, 'ACTION': 'header'}
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, user: user_client
+        })
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 5)
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        # Анонимный запрос дважды (промах и попадание кэша ответов), затем
+        # запрос с токеном: бюджеты учитывают загрузку пользователя.
+        clients = (client, client, user_client)
+        urls = [
+            ('/api/v1/titles/', clients),
+            ('/api/v1/titles/?exact_count=true', clients),
+            ('/api/v1/titles/?expand=reviews', clients),
+            (title_url, clients),
+            ('/api/v1/titles/top/', clients),
+            (f'{title_url}stats/', clients),
+            (f'{title_url}page/', clients),
+            ('/api/v1/titles/autocomplete/?q=кре', clients),
+            (f'/api/v1/titles/batch/?ids={titles[0]["id"]}', clients),
+            (f'{title_url}reviews/', clients),
+            (review_url, clients),
+            (f'{review_url}comments/', clients),
+            (f'{review_url}comments/{comments[0]["id"]}/', clients),
+            ('/api/v1/categories/', clients),
+            ('/api/v1/genres/', clients),
+            ('/api/v1/search/reviews/?q=отзыв', (admin_client,)),
+        ]
+        for url, request_clients in urls:
+            for request_client in request_clients:
+                response = request_client.get(url)
+                assert response.status_code == HTTPStatus.OK, url
+                assert int(response['X-Query-Count']) <= int(
+                    response['X-Query-Budget']
+                ), (
+                    f'GET-запрос к `{url}` выполнил '
+                    f'{response["X-Query-Count"]} SQL-запросов при бюджете '
+                    f'{response["X-Query-Budget"]} из QUERY_BUDGET в '
+                    'settings.py.'
+                )
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleFilters:
+    url = '/api/v1/titles/'
+
+    def get_ids(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        return sorted(title['id'] for title in response.json()['results'])
+
+    def test_01_genre_any_and_all(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        horror, comedy, drama = (genre['slug'] for genre in genres)
+
+        assert self.get_ids(client, f'genre={horror},{comedy}') == [
+            terminator
+        ], (
+            f'Проверьте, что при фильтрации `{self.url}` по нескольким '
+            'жанрам произведение с несколькими подходящими жанрами '
+            'возвращается один раз.'
+        )
+        assert self.get_ids(client, f'genre={horror},{drama}') == sorted(
+            [terminator, die_hard]
+        ), (
+            f'Проверьте, что `{self.url}?genre=a,b` возвращает '
+            'произведения хотя бы с одним из жанров.'
+        )
+        assert self.get_ids(client, f'genre_all={horror},{comedy}') == [
+            terminator
+        ]
+        assert self.get_ids(client, f'genre_all={horror},{drama}') == [], (
+            f'Проверьте, что `{self.url}?genre_all=a,b` возвращает только '
+            'произведения со всеми перечисленными жанрами.'
+        )
+
+    def test_02_category(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        slugs = ','.join(category['slug'] for category in categories)
+        assert self.get_ids(client, f'category={slugs}') == sorted(
+            title['id'] for title in titles
+        ), (
+            f'Проверьте, что `{self.url}` фильтрует по нескольким '
+            'категориям через запятую.'
+        )
+        assert self.get_ids(client, 'category=unknown') == []
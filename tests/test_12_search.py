@@ -0,0 +1,135 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from reviews import search
+
+from tests.utils import create_categories, create_titles
+
+
+def search_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+EXPECTED_TRIGGERS = {
+    f'{search.fts_table(table)}_{suffix}'
+    for table in search.SEARCH_INDEXES
+    for suffix in search.TRIGGER_SUFFIXES
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Search:
+    url = '/api/v1/titles/'
+
+    def search(self, client, url, query):
+        response = client.get(url, {'search': query})
+        return [item['name'] for item in response.json()['results']]
+
+    def test_01_titles_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, self.url, 'терм') == ['Терминатор'], (
+            f'Проверьте, что `{self.url}?search=` находит произведения '
+            'по началу слова в названии без учёта регистра.'
+        )
+        assert self.search(client, self.url, 'yippie') == [
+            'Крепкий орешек'
+        ], (
+            f'Проверьте, что `{self.url}?search=` ищет и по описанию.'
+        )
+        assert self.search(client, self.url, 'крепкий терминатор') == [], (
+            f'Проверьте, что `{self.url}?search=` возвращает только '
+            'произведения, содержащие все слова запроса.'
+        )
+        assert self.search(client, self.url, '"* OR') == [], (
+            'Проверьте, что операторы FTS5 в запросе не приводят к ошибке.'
+        )
+
+    def test_02_relevance_and_filters(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[1]["id"]}/',
+            data={'description': 'Орешек, орешек и ещё раз орешек'},
+        )
+        data = {
+            'name': 'Щелкунчик',
+            'year': 1892,
+            'genre': [],
+            'category': categories[0]['slug'],
+            'description': 'Щелкунчик колет орешек',
+        }
+        admin_client.post(self.url, data=data)
+        assert self.search(client, self.url, 'орешек') == [
+            'Крепкий орешек', 'Щелкунчик'
+        ], (
+            f'Проверьте, что результаты `{self.url}?search=` упорядочены '
+            'по релевантности.'
+        )
+        response = client.get(self.url, {
+            'search': 'орешек', 'category': categories[0]['slug']
+        })
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == ['Щелкунчик'], (
+            'Проверьте, что поиск сочетается с фильтрами произведений.'
+        )
+
+    def test_03_index_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[0]["id"]}/', data={'name': 'Робокоп'}
+        )
+        assert self.search(client, self.url, 'терминатор') == []
+        assert self.search(client, self.url, 'робокоп') == ['Робокоп'], (
+            'Проверьте, что индекс обновляется при изменении произведения.'
+        )
+        admin_client.delete(f'{self.url}{titles[0]["id"]}/')
+        assert self.search(client, self.url, 'робокоп') == [], (
+            'Проверьте, что индекс обновляется при удалении произведения.'
+        )
+
+    def test_04_categories_and_genres(self, client, admin_client):
+        create_categories(admin_client)
+        call_command('rebuild_search_index')
+        assert self.search(
+            client, '/api/v1/categories/', 'кни'
+        ) == ['Книги'], (
+            'Проверьте, что `/api/v1/categories/?search=` ищет по '
+            'полнотекстовому индексу.'
+        )
+
+    def test_05_triggers_after_migrations(self, client, admin_client):
+        assert EXPECTED_TRIGGERS <= search_triggers(), (
+            'Проверьте, что после последней миграции у всех '
+            'полнотекстовых индексов есть триггеры.'
+        )
+        # Откат и повтор миграций, пересоздающих таблицы на SQLite.
+        call_command('migrate', 'reviews', '0020', verbosity=0)
+        call_command('migrate', 'reviews', verbosity=0)
+        assert EXPECTED_TRIGGERS <= search_triggers()
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[0]["id"]}/', data={'name': 'Робокоп'}
+        )
+        assert self.search(client, self.url, 'робокоп') == ['Робокоп'], (
+            'Проверьте, что поиск работает после применения миграций.'
+        )
+
+    def test_06_restore_missing_triggers(self, client, admin_client):
+        # Так выглядит база после миграции, которая пересоздала таблицу
+        # и не вернула триггеры.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_fts_ai')
+        create_titles(admin_client)
+        assert self.search(client, self.url, 'терм') == []
+        call_command('migrate', verbosity=0)
+        assert EXPECTED_TRIGGERS <= search_triggers(), (
+            'Проверьте, что `migrate` восстанавливает удалённые триггеры.'
+        )
+        assert self.search(client, self.url, 'терм') == ['Терминатор'], (
+            'Проверьте, что индекс без триггеров пересобирается после '
+            '`migrate`.'
+        )
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TextSearch:
+    url = '/api/v1/search/reviews/'
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        assert client.get(self.url, {'q': 'x'}).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.url, {'q': 'x'}).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            f'Проверьте, что `{self.url}` недоступен обычному пользователю.'
+        )
+        assert moderator_client.get(self.url, {'q': 'x'}).status_code == (
+            HTTPStatus.OK
+        )
+        assert moderator_client.get(self.url, {'q': '"*'}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            f'Проверьте, что `{self.url}` без слов для поиска возвращает 400.'
+        )
+
+    def test_02_reviews_and_comments(self, admin_client, user_client,
+                                     moderator_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Отвратительный <b>фильм</b>', 1
+        ).json()
+        create_single_review(admin_client, title_id, 'Отличный фильм', 10)
+        comment = create_single_comment(
+            admin_client, title_id, review['id'],
+            'Согласен, фильм отвратительный'
+        ).json()
+
+        response = moderator_client.get(self.url, {'q': 'отвратит'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 2, (
+            f'Проверьте, что `{self.url}` ищет и в отзывах, и в комментариях.'
+        )
+        results = {item['type']: item for item in data['results']}
+        assert results['review'] == {
+            'type': 'review',
+            'id': review['id'],
+            'title_id': title_id,
+            'review_id': None,
+            'author': user.username,
+            'text': 'Отвратительный <b>фильм</b>',
+            'pub_date': review['pub_date'],
+            'snippet': '<mark>Отвратительный</mark> &lt;b&gt;фильм&lt;/b&gt;',
+        }, (
+            f'Проверьте поля результата `{self.url}`: фрагмент текста '
+            'экранируется, найденные слова выделяются тегом <mark>.'
+        )
+        assert results['comment']['id'] == comment['id']
+        assert results['comment']['review_id'] == review['id']
+        assert results['comment']['title_id'] == title_id
+
+    def test_03_index_follows_writes(self, admin_client, user_client,
+                                     moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Грубое слово', 1
+        ).json()
+        url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        moderator_client.patch(url, data={'text': 'Исправленный текст'})
+        assert moderator_client.get(
+            self.url, {'q': 'грубое'}
+        ).json()['count'] == 0, (
+            'Проверьте, что индекс обновляется при изменении отзыва.'
+        )
+        assert moderator_client.get(
+            self.url, {'q': 'исправленный'}
+        ).json()['count'] == 1
+        moderator_client.delete(url)
+        assert moderator_client.get(
+            self.url, {'q': 'исправленный'}
+        ).json()['count'] == 0, (
+            'Проверьте, что индекс обновляется при удалении отзыва.'
+        )
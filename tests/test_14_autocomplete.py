@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Autocomplete:
+    url = '/api/v1/titles/autocomplete/'
+
+    def names(self, client, query, **params):
+        response = client.get(self.url, {'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.url}` доступен без токена.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_prefix_and_typos(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert client.get(self.url, {'q': 'кре'}).json() == [
+            {'id': titles[1]['id'], 'name': 'Крепкий орешек'}
+        ], (
+            f'Проверьте, что `{self.url}` возвращает id и название '
+            'произведений по началу названия.'
+        )
+        assert self.names(client, 'ореш') == ['Крепкий орешек'], (
+            f'Проверьте, что `{self.url}` ищет по началу любого слова.'
+        )
+        assert self.names(client, 'терминтор') == ['Терминатор'], (
+            f'Проверьте, что `{self.url}` находит названия с опечаткой.'
+        )
+        assert self.names(client, 'щщщ') == []
+        assert self.names(client, '') == []
+
+    def test_02_limit(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Крёстный отец',
+            'year': 1972,
+            'genre': [titles[0]['genre'][0]],
+            'category': titles[0]['category'],
+        })
+        assert sorted(self.names(client, 'кре')) == [
+            'Крепкий орешек', 'Крёстный отец'
+        ], (
+            f'Проверьте, что `{self.url}` не различает «е» и «ё».'
+        )
+        assert len(self.names(client, 'кре', limit=1)) == 1, (
+            f'Проверьте, что `{self.url}` учитывает параметр `limit`.'
+        )
+        response = client.get(self.url, {'q': 'кре', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_index_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.names(client, 'терм') == ['Терминатор']
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Робокоп'})
+        assert self.names(client, 'терм') == []
+        assert self.names(client, 'роб') == ['Робокоп'], (
+            'Проверьте, что индекс подсказок обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(url)
+        assert self.names(client, 'роб') == [], (
+            'Проверьте, что индекс подсказок обновляется при удалении '
+            'произведения.'
+        )
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Робокоп 2',
+            'year': 1990,
+            'genre': [titles[0]['genre'][0]],
+            'category': titles[0]['category'],
+        })
+        assert self.names(client, 'роб') == ['Робокоп 2'], (
+            'Проверьте, что индекс подсказок обновляется при добавлении '
+            'произведения.'
+        )
+
+    def test_04_served_from_memory(self, client, admin_client):
+        create_titles(admin_client)
+        self.names(client, 'кре')
+        with CaptureQueriesContext(connection) as queries:
+            self.names(client, 'кре')
+        # Единственный запрос - чтение поколений моделей: по поколению
+        # произведений индекс узнаёт о записях в других процессах.
+        assert len(queries) == 1, (
+            f'Проверьте, что `{self.url}` отвечает из индекса в памяти, '
+            'без запросов к таблице произведений.'
+        )
+
+    def test_05_writes_in_other_process(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.names(client, 'кре') == ['Крепкий орешек']
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Кремлёвские куранты',
+            'year': 1970,
+            'genre': [titles[0]['genre'][0]],
+            'category': titles[0]['category'],
+        })
+        with CaptureQueriesContext(connection) as queries:
+            assert self.names(client, 'кремл') == ['Кремлёвские куранты']
+        assert len(queries) == 1, (
+            'Проверьте, что запись этого процесса обновляет индекс без '
+            'его перестроения.'
+        )
+
+        # Запись в другом процессе: поколение Title меняется, а индекс
+        # этого процесса не обновляется.
+        title = Title.objects.get(id=titles[1]['id'])
+        title.name = 'Кремень'
+        title.save()
+        assert self.names(client, 'кре') == [
+            'Кремень', 'Кремлёвские куранты'
+        ], (
+            'Проверьте, что индекс перестраивается, если поколение '
+            'произведений изменилось в другом процессе.'
+        )
+        Title.objects.filter(id=title.id).delete()
+        assert self.names(client, 'кре') == ['Кремлёвские куранты'], (
+            'Проверьте, что произведения, удалённые в другом процессе, '
+            'пропадают из подсказок.'
+        )
@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from reviews.models import Categories, Title, User
+
+from tests.utils import create_single_review
+
+
+def create_titles_bulk(count):
+    category = Categories.objects.create(name='Музыка', slug='music')
+    return [
+        Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        ).id
+        for idx in range(count)
+    ]
+
+
+def collect(client, url, key='id'):
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        ids += [item[key] for item in data['results']]
+        url = data['next']
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15CursorPagination:
+    url = '/api/v1/titles/'
+
+    def test_01_page_numbers_by_default(self, client):
+        create_titles_bulk(7)
+        data = client.get(self.url).json()
+        assert data['count'] == 7, (
+            f'Проверьте, что без параметра `cursor` `{self.url}` '
+            'по-прежнему возвращает номера страниц и `count`.'
+        )
+
+    def test_02_cursor_pages(self, client):
+        ids = create_titles_bulk(12)
+        response = client.get(self.url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert set(data) == {'next', 'previous', 'results'}, (
+            f'Проверьте, что с параметром `cursor` `{self.url}` возвращает '
+            '`next`, `previous` и `results` без `count`.'
+        )
+        assert data['previous'] is None
+        collected, pages = collect(client, data['next'])
+        collected = [item['id'] for item in data['results']] + collected
+        assert collected == sorted(ids, reverse=True), (
+            'Проверьте, что страницы по курсору идут в порядке убывания id '
+            'без пропусков и повторов.'
+        )
+        assert pages == 2
+
+    def test_03_stable_under_inserts(self, client):
+        ids = create_titles_bulk(8)
+        first = client.get(self.url, {'cursor': ''}).json()
+        category = Categories.objects.get()
+        Title.objects.create(name='Новинка', year=2001, category=category)
+        second = client.get(first['next']).json()
+        assert [item['id'] for item in second['results']] == sorted(
+            ids, reverse=True
+        )[5:], (
+            'Проверьте, что добавление записей между запросами не сдвигает '
+            'страницы курсора.'
+        )
+        previous = client.get(second['previous']).json()
+        assert previous['results'] == first['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_04_no_count_query(self, client, django_assert_num_queries):
+        create_titles_bulk(7)
+        with django_assert_num_queries(3, info=(
+            'Проверьте, что в режиме курсора количество записей '
+            'не считается.'
+        )):
+            client.get(self.url, {'cursor': ''})
+
+    def test_05_reviews_and_users(self, admin_client, user_client):
+        title_id = create_titles_bulk(1)[0]
+        create_single_review(user_client, title_id, 'Отзыв', 5)
+        url = f'/api/v1/titles/{title_id}/reviews/?cursor='
+        data = admin_client.get(url).json()
+        assert len(data['results']) == 1 and 'count' not in data
+        User.objects.bulk_create(
+            User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+            for idx in range(6)
+        )
+        usernames, pages = collect(
+            admin_client, '/api/v1/users/?cursor=', key='username'
+        )
+        assert usernames == list(
+            User.objects.order_by('id').values_list('username', flat=True)
+        ) and pages == 2, (
+            'Проверьте, что пользователи в режиме курсора идут в порядке '
+            'возрастания id.'
+        )
+
+    def test_06_search_with_cursor(self, client):
+        create_titles_bulk(2)
+        for url in (self.url, '/api/v1/categories/'):
+            response = client.get(url, {'search': 'Музыка', 'cursor': ''})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{url}` отклоняет `search` вместе с '
+                '`cursor`: страницы по курсору идут по id, а не по '
+                'релевантности.'
+            )
+            assert 'search' in response.json()
+        response = client.get(self.url, {'search': '', 'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,63 @@
+import pytest
+from reviews.models import Categories, Title
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ApproximateCount:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def disable_response_cache(self, settings):
+        # Иначе повторные запросы отдаются из кэша ответов целиком.
+        settings.RESPONSE_CACHE = {'ROUTES': {}}
+
+    def test_01_cached_count(self, client, admin_client,
+                             django_assert_num_queries):
+        create_titles(admin_client)
+        data = client.get(self.url).json()
+        assert data['count'] == 2 and data['count_approximate'] is False, (
+            f'Проверьте, что первый запрос к `{self.url}` считает '
+            'количество записей и помечает его как точное.'
+        )
+        # Поколения моделей, произведения и жанры.
+        with django_assert_num_queries(3, info=(
+            'Проверьте, что повторный запрос берёт количество из кэша.'
+        )):
+            data = client.get(self.url).json()
+        assert data['count'] == 2 and data['count_approximate'] is True, (
+            'Проверьте, что количество из кэша помечается '
+            '`count_approximate: true`.'
+        )
+
+    def test_02_invalidated_by_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.url)
+        admin_client.delete(f'{self.url}{titles[0]["id"]}/')
+        data = client.get(self.url).json()
+        assert data['count'] == 1 and data['count_approximate'] is False, (
+            'Проверьте, что изменения через API сбрасывают кэш количества.'
+        )
+        review_url = f'{self.url}{titles[1]["id"]}/reviews/'
+        assert client.get(review_url).json()['count'] == 0
+        admin_client.post(review_url, data={'text': 'Отзыв', 'score': 5})
+        assert client.get(review_url).json()['count'] == 1
+
+    def test_03_exact_count(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.url)
+        # Запись в обход сигналов не сбрасывает кэш.
+        Title.objects.bulk_create([Title(
+            name='Щелкунчик', year=1892,
+            category=Categories.objects.first(),
+        )])
+        assert client.get(self.url).json()['count'] == 2
+        data = client.get(self.url, {'exact_count': 'true'}).json()
+        assert data['count'] == 3 and data['count_approximate'] is False, (
+            f'Проверьте, что `{self.url}?exact_count=true` считает '
+            'количество записей точно.'
+        )
+        assert client.get(self.url).json()['count'] == 3, (
+            'Проверьте, что точный подсчёт обновляет кэш.'
+        )
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17SparseFields:
+    url = '/api/v1/titles/'
+
+    def test_01_fields(self, client, admin_client,
+                       django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.url}?fields=id,name,rating&exact_count=true'
+        with django_assert_num_queries(3, info=(
+            'Проверьте, что без полей genre и category жанры и категории '
+            'не загружаются.'
+        )):
+            response = client.get(url)
+        assert response.json()['results'][0] == {
+            'id': titles[1]['id'], 'name': titles[1]['name'], 'rating': None
+        }, (
+            f'Проверьте, что `{self.url}?fields=` возвращает только '
+            'перечисленные поля.'
+        )
+        response = client.get(
+            f'{self.url}{titles[0]["id"]}/', {'fields': 'name,genre'}
+        )
+        assert set(response.json()) == {'name', 'genre'}
+        response = client.get(self.url, {'fields': 'name,password'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.url}?fields=` с неизвестным полем '
+            'возвращает 400.'
+        )
+        for url in (self.url, f'{self.url}batch/?ids={titles[0]["id"]}'):
+            response = client.get(url, {'fields': 'weighted_rating'})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что `?fields=` проверяется по полям '
+                'сериализатора действия: `weighted_rating` есть только '
+                'в `/titles/top/`.'
+            )
+        response = client.get(
+            f'{self.url}top/', {'fields': 'weighted_rating'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_expand_reviews(self, client, admin_client, user_client,
+                               moderator_client, django_assert_num_queries,
+                               settings):
+        settings.EXPAND_REVIEWS_COUNT = 2
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        reviews = [
+            create_single_review(author, title_id, f'Отзыв {idx}', 5).json()
+            for idx, author in enumerate(
+                (admin_client, user_client, moderator_client)
+            )
+        ]
+        url = f'{self.url}?expand=reviews&fields=id&exact_count=true'
+        with django_assert_num_queries(4, info=(
+            'Проверьте, что отзывы загружаются одним запросом на страницу.'
+        )):
+            response = client.get(url)
+        results = {
+            title['id']: title['reviews']
+            for title in response.json()['results']
+        }
+        assert results[title_id] == reviews[:0:-1], (
+            f'Проверьте, что `{self.url}?expand=reviews` добавляет '
+            'последние отзывы произведения, новые первыми.'
+        )
+        assert results[titles[1]['id']] == []
+        response = client.get(self.url, {'expand': 'comments'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from api.readers import COMMENT_READ_PLAN, REVIEW_READ_PLAN, TITLE_READ_PLAN
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitlesReadSerializer)
+from api.views import ReviewViewSet
+from reviews.models import Comment, Review, Title
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18FastRead:
+
+    def check_identical(self, plan, serializer_class, queryset):
+        expected = JSONRenderer().render(
+            serializer_class(queryset, many=True).data
+        )
+        actual = JSONRenderer().render(plan.render(plan.values(queryset)))
+        assert actual == expected, (
+            f'Проверьте, что план чтения выдаёт тот же JSON, что и '
+            f'`{serializer_class.__name__}`.'
+        )
+
+    def test_01_identical_json(self, admin_client, user_client,
+                               moderator_client, user, moderator):
+        _, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        admin_client.delete(f'/api/v1/categories/{titles[1]["category"]}/')
+        Title.objects.create(name='Без описания', year=2000)
+        Review.objects.filter(id=reviews[0]['id']).update(score=None)
+
+        self.check_identical(
+            TITLE_READ_PLAN, TitlesReadSerializer,
+            Title.objects.order_by('-id').prefetch_related('genre')
+        )
+        self.check_identical(
+            REVIEW_READ_PLAN, ReviewSerializer, Review.objects.all()
+        )
+        self.check_identical(
+            COMMENT_READ_PLAN, CommentSerializer, Comment.objects.all()
+        )
+
+    def test_02_endpoints(self, client, admin_client, user_client,
+                          moderator_client, user, moderator):
+        _, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        cases = (
+            (
+                '/api/v1/titles/', TitlesReadSerializer,
+                Title.objects.order_by('-id'),
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/', ReviewSerializer,
+                Review.objects.filter(title_id=title_id),
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                CommentSerializer, Comment.objects.filter(review_id=review_id),
+            ),
+        )
+        for url, serializer_class, queryset in cases:
+            assert client.get(url).json()['results'] == (
+                serializer_class(queryset, many=True).data
+            ), f'Проверьте содержимое ответа на GET-запрос к `{url}`.'
+            obj = queryset.first()
+            assert client.get(f'{url}{obj.id}/').json() == (
+                serializer_class(obj).data
+            ), f'Проверьте содержимое ответа на GET-запрос к `{url}<id>/`.'
+
+    def test_03_object_permissions(self, admin_client, user_client,
+                                   moderator_client, user, moderator,
+                                   monkeypatch):
+        _, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        checked = []
+
+        class AuthorOnly(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                checked.append(obj)
+                return obj.author.username == user.username
+
+        monkeypatch.setattr(ReviewViewSet, 'permission_classes', (AuthorOnly,))
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{{}}/'
+        assert admin_client.get(
+            url.format(reviews[0]['id'])
+        ).status_code == HTTPStatus.OK
+        assert admin_client.get(
+            url.format(reviews[1]['id'])
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что права на объект проверяются на экземпляре '
+            'модели, поля которого может прочитать разрешение.'
+        )
+        assert all(isinstance(obj, Review) for obj in checked)
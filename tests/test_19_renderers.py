@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import uuid
+from http import HTTPStatus
+
+import pytest
+from api.renderers import FastJSONRenderer
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_titles
+
+PAYLOAD = {
+    'id': 1,
+    'name': 'Сталкер\u2028\u2029«Пикник»',
+    'rating': None,
+    'score': decimal.Decimal('7.50'),
+    'weighted_rating': 7.25,
+    'big': 2 ** 70,
+    'pub_date': datetime.datetime(
+        2023, 1, 2, 3, 4, 5, 678900, tzinfo=timezone.utc
+    ),
+    'pub_date_seconds': datetime.datetime(
+        2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc
+    ),
+    'date': datetime.date(2023, 1, 2),
+    'uuid': uuid.UUID(int=1),
+    'genre': ({'name': 'Фантастика', 'slug': 'sci-fi'},),
+}
+
+
+class Test19Renderers:
+
+    @pytest.mark.parametrize('use_orjson', (True, False))
+    def test_01_same_bytes(self, monkeypatch, use_orjson):
+        monkeypatch.setattr(FastJSONRenderer, 'use_orjson', use_orjson)
+        renderer = FastJSONRenderer()
+        for data in (PAYLOAD, [PAYLOAD, PAYLOAD], [], None):
+            assert renderer.render(data) == JSONRenderer().render(data), (
+                'Проверьте, что `FastJSONRenderer` выдаёт те же байты, что и '
+                '`JSONRenderer`.'
+            )
+        assert renderer.render(
+            PAYLOAD, 'application/json; indent=4'
+        ) == JSONRenderer().render(PAYLOAD, 'application/json; indent=4')
+
+    @pytest.mark.parametrize('use_orjson', (True, False))
+    def test_02_iter_render(self, monkeypatch, use_orjson):
+        monkeypatch.setattr(FastJSONRenderer, 'use_orjson', use_orjson)
+        renderer = FastJSONRenderer()
+        items = [PAYLOAD] * 50
+        chunks = list(renderer.iter_render(iter(items), batch_size=7))
+        assert len(chunks) > 1, (
+            'Проверьте, что `iter_render` отдаёт список по частям.'
+        )
+        assert b''.join(chunks) == JSONRenderer().render(items), (
+            'Проверьте, что части `iter_render` складываются в тот же JSON, '
+            'что и у `JSONRenderer`.'
+        )
+        assert b''.join(renderer.iter_render(iter([]))) == b'[]'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19JSONParser:
+
+    def test_01_json_body(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'name': 'Терминатор 2', 'genre': [genres[2]['slug']]},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что API принимает тело запроса в формате JSON.'
+        )
+        assert response.json()['name'] == 'Терминатор 2'
+        assert response['Content-Type'] == 'application/json'
+
+    def test_02_invalid_json(self, admin_client):
+        for body in (b'{"name": ', b'{"year": NaN}'):
+            response = admin_client.post(
+                '/api/v1/titles/', data=body,
+                content_type='application/json',
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что некорректный JSON в теле запроса '
+                'возвращает 400.'
+            )
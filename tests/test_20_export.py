@@ -0,0 +1,119 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from reviews.models import Comment, Review, Title
+
+from tests.utils import create_comments
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Export:
+    url = '/api/v1/export/{}.ndjson'
+
+    def test_01_permissions(self, client, user_client, moderator_client,
+                            admin_client):
+        url = self.url.format('reviews')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{url}` доступен только администратору.'
+            )
+        response = admin_client.get(
+            url, HTTP_ACCEPT='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(self.url.format('users'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_export(self, admin_client, user_client, moderator_client,
+                       user, moderator, settings,
+                       django_assert_num_queries):
+        settings.EXPORT_CHUNK_SIZE = 1
+        comments, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        response = admin_client.get(self.url.format('titles'))
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоково.'
+        )
+        # Порция из одной строки: запрос строк и жанров на каждую и
+        # последний пустой запрос.
+        with django_assert_num_queries(2 * len(titles) + 1):
+            lines = read_lines(response)
+        assert [line['id'] for line in lines] == sorted(
+            title['id'] for title in titles
+        ), (
+            'Проверьте, что выгрузка содержит все произведения по '
+            'возрастанию id.'
+        )
+        assert {line['name'] for line in lines} == {
+            title['name'] for title in titles
+        }
+
+        response = admin_client.get(self.url.format('reviews'))
+        lines = read_lines(response)
+        assert [line['id'] for line in lines] == sorted(
+            review['id'] for review in reviews
+        )
+        assert set(lines[0]) == {
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count',
+            'title',
+        }, 'Проверьте поля строк выгрузки отзывов.'
+        assert lines[0]['title'] == titles[0]['id']
+
+        response = admin_client.get(self.url.format('comments'))
+        lines = read_lines(response)
+        assert [line['text'] for line in lines] == [
+            comment['text'] for comment in comments
+        ]
+        assert lines[0]['review'] == reviews[0]['id']
+
+    def test_03_since(self, admin_client, user_client, moderator_client,
+                      user, moderator):
+        comments, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        since = timezone.now() - timezone.timedelta(days=1)
+        Review.objects.filter(id=reviews[0]['id']).update(
+            pub_date=since - timezone.timedelta(days=1)
+        )
+        Comment.objects.filter(id=comments[1]['id']).update(
+            pub_date=since - timezone.timedelta(days=1)
+        )
+        params = {'since': since.isoformat()}
+        response = admin_client.get(self.url.format('reviews'), params)
+        assert [line['id'] for line in read_lines(response)] == [
+            reviews[1]['id']
+        ], (
+            'Проверьте, что `?since=` оставляет в выгрузке только записи, '
+            'опубликованные не раньше указанного времени.'
+        )
+        response = admin_client.get(self.url.format('comments'), params)
+        assert [line['id'] for line in read_lines(response)] == [
+            comments[0]['id']
+        ]
+        response = admin_client.get(
+            self.url.format('reviews'), {'since': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'since' in response.json()
+
+        Title.objects.exclude(id=titles[0]['id']).update(
+            updated_at=since - timezone.timedelta(days=1)
+        )
+        response = admin_client.get(self.url.format('titles'), params)
+        assert [line['id'] for line in read_lines(response)] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что `?since=` оставляет в выгрузке произведений '
+            'только изменённые не раньше указанного времени.'
+        )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import GenreTitle, Title
+
+from tests.utils import create_categories, create_genre
+
+
+def make_titles(count, genres, category):
+    return [
+        {
+            'name': f'Произведение {i}',
+            'year': 2000 + i % 20,
+            'description': f'Описание {i}',
+            'genre': [genre['slug'] for genre in genres[:1 + i % 3]],
+            'category': category['slug'],
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BulkTitles:
+    url = '/api/v1/titles/bulk/'
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        data = [{'name': 'Фильм', 'year': 2000, 'genre': [], 'category': 'x'}]
+        assert client.post(
+            self.url, data=data, content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            response = role_client.post(self.url, data=data, format='json')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{self.url}` доступен только администратору.'
+            )
+
+    def test_02_create(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        client.get('/api/v1/titles/')
+        data = make_titles(3, genres, categories[0])
+        data[0]['genre'].append(genres[0]['slug'])
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` с '
+            'корректными данными возвращает 201.'
+        )
+        created = response.json()
+        ids = [item.pop('id') for item in created]
+        data[0]['genre'].pop()
+        assert created == data, (
+            f'Проверьте, что `{self.url}` возвращает созданные произведения '
+            'в порядке запроса.'
+        )
+        assert list(Title.objects.order_by('id').values_list(
+            'id', 'name'
+        )) == [(pk, item['name']) for pk, item in zip(ids, data)]
+        assert GenreTitle.objects.count() == 6
+        assert client.get('/api/v1/titles/').json()['count'] == 3, (
+            'Проверьте, что после массового создания кэш количества '
+            'произведений сбрасывается.'
+        )
+        response = client.get(f'/api/v1/titles/{ids[2]}/')
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            genre['slug'] for genre in genres
+        ][::-1]
+        response = client.get(
+            '/api/v1/titles/autocomplete/', {'q': 'Произведение'}
+        )
+        assert len(response.json()) == 3, (
+            'Проверьте, что созданные произведения попадают в подсказки.'
+        )
+
+    def test_03_query_count(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        counts = []
+        for size in (5, 200):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.url, data=make_titles(size, genres, categories[1]),
+                    format='json',
+                )
+            assert response.status_code == HTTPStatus.CREATED
+            # INSERT разбивается на пачки по лимиту параметров SQLite.
+            counts.append(sum(
+                not query['sql'].startswith('INSERT')
+                for query in context.captured_queries
+            ))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число SQL-запросов `{self.url}`, кроме пачек '
+            'INSERT, не зависит от количества произведений.'
+        )
+
+    def test_04_errors(self, admin_client, settings):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = make_titles(3, genres, categories[0])
+        data[1]['category'] = 'unknown'
+        data[2]['genre'] = ['horror', 'unknown']
+        data[2]['year'] = 3000
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            f'Проверьте, что `{self.url}` возвращает ошибки по каждому '
+            'элементу, с пустым объектом для корректных.'
+        )
+        assert set(errors[1]) == {'category'}
+        assert set(errors[2]) == {'genre', 'year'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в любом элементе ни одно '
+            'произведение не создаётся.'
+        )
+
+        for body in ([], {'name': 'Не список'}):
+            response = admin_client.post(self.url, data=body, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        settings.TITLES_BULK_MAX_SIZE = 2
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.url}` ограничивает размер списка.'
+        )
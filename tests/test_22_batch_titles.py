@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BatchTitles:
+    url = '/api/v1/titles/batch/'
+
+    def test_01_batch(self, client, admin_client,
+                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        missing = second + 100
+        with django_assert_num_queries(3, info=(
+            'Проверьте, что произведения, их категории и жанры загружаются '
+            'постоянным числом запросов.'
+        )):
+            response = client.get(
+                self.url, {'ids': f'{second},{missing},{first},{second}'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert list(data['results']) == [str(second), str(first)], (
+            f'Проверьте, что `{self.url}` возвращает произведения с '
+            'ключами-id в порядке запроса.'
+        )
+        assert data['missing'] == [missing], (
+            f'Проверьте, что `{self.url}` перечисляет ненайденные id в '
+            '`missing`.'
+        )
+        for pk in (first, second):
+            assert data['results'][str(pk)] == client.get(
+                f'/api/v1/titles/{pk}/'
+            ).json(), (
+                f'Проверьте, что `{self.url}` отдаёт произведения в том же '
+                'виде, что и `/api/v1/titles/{titles_id}/`.'
+            )
+
+        response = client.get(self.url, {'ids': first, 'fields': 'name'})
+        assert response.json()['results'] == {
+            str(first): {'name': titles[0]['name']}
+        }
+
+    def test_02_invalid(self, client, settings):
+        settings.TITLES_BATCH_MAX_SIZE = 2
+        for ids in ('', 'a,b', '1,2,3'):
+            response = client.get(self.url, {'ids': ids})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.url}?ids={ids}` возвращает 400.'
+            )
+        response = client.get(self.url, {'ids': '1,2,2,1'})
+        assert response.json() == {'results': {}, 'missing': [1, 2]}
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from reviews.models import Review, User
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitlePage:
+    url = '/api/v1/titles/{}/page/'
+
+    def test_01_page(self, client, admin_client, user_client, settings,
+                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_ids = []
+        for author_client in (user_client, admin_client):
+            response = create_single_review(
+                author_client, title_id, 'Отзыв', 5
+            )
+            review_ids.append(response.json()['id'])
+        for author_number in range(5):
+            author = User.objects.create(
+                username=f'author{author_number}',
+                email=f'author{author_number}@yamdb.fake',
+            )
+            review_ids.append(Review.objects.create(
+                title_id=title_id, author=author, text='Отзыв', score=1
+            ).id)
+        for _ in range(2):
+            create_single_comment(
+                admin_client, title_id, review_ids[-1], 'Комментарий'
+            )
+
+        with django_assert_num_queries(4, info=(
+            'Проверьте, что страница произведения собирается постоянным '
+            'числом запросов.'
+        )):
+            response = client.get(self.url.format(title_id))
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['title'] == client.get(
+            f'/api/v1/titles/{title_id}/'
+        ).json(), 'Проверьте поле `title` страницы произведения.'
+        assert data['stats'] == client.get(
+            f'/api/v1/titles/{title_id}/stats/'
+        ).json(), 'Проверьте поле `stats` страницы произведения.'
+
+        reviews = data['reviews']['results']
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        assert [review['id'] for review in reviews] == sorted(
+            review_ids, reverse=True
+        )[:page_size], (
+            'Проверьте, что страница произведения содержит первую страницу '
+            'отзывов, новые первыми.'
+        )
+        assert reviews[0]['author'] == 'author4'
+        assert [review['comment_count'] for review in reviews] == [
+            2, 0, 0, 0, 0
+        ], 'Проверьте число комментариев к отзывам.'
+
+        next_url = data['reviews']['next']
+        assert f'/api/v1/titles/{title_id}/reviews/?cursor=' in next_url, (
+            'Проверьте, что ссылка `next` ведёт на список отзывов.'
+        )
+        response = client.get(next_url)
+        assert [review['id'] for review in response.json()['results']] == (
+            sorted(review_ids, reverse=True)[page_size:]
+        )
+
+    def test_02_not_found(self, client):
+        response = client.get(self.url.format(1))
+        assert response.status_code == HTTPStatus.NOT_FOUND
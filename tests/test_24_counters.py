@@ -0,0 +1,143 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Comment, Review, Title
+
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review, create_titles)
+
+
+def counts(model, field):
+    return dict(model.objects.values_list('id', field))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Counters:
+
+    def test_01_create_and_delete(self, admin_client, user_client,
+                                  moderator_client, user, moderator):
+        comments, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        assert Title.objects.get(id=title_id).review_count == 2, (
+            'Проверьте, что создание отзыва увеличивает `review_count` '
+            'произведения.'
+        )
+        assert counts(Review, 'comment_count') == {
+            reviews[0]['id']: 2, reviews[1]['id']: 0
+        }, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comment_count` отзыва.'
+        )
+
+        review_url = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        user_client.patch(review_url, data={'text': 'Изменённый отзыв'})
+        assert Review.objects.get(id=review_id).comment_count == 2, (
+            'Проверьте, что изменение отзыва не сбрасывает `comment_count`.'
+        )
+
+        admin_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        assert Review.objects.get(id=review_id).comment_count == 1, (
+            'Проверьте, что удаление комментария уменьшает `comment_count`.'
+        )
+        moderator.delete()
+        assert Title.objects.get(id=title_id).review_count == 1, (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'уменьшает `review_count`.'
+        )
+        assert Review.objects.get(id=review_id).comment_count == 0
+        admin_client.delete(review_url)
+        assert Title.objects.get(id=title_id).review_count == 0
+
+    def test_02_ordering(self, client, admin_client, user_client,
+                         moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        review_ids = [
+            create_single_review(author, second, 'Отзыв', 5).json()['id']
+            for author in (user_client, moderator_client)
+        ]
+        create_single_review(user_client, first, 'Отзыв', 5)
+        create_single_comment(admin_client, second, review_ids[0], 'Да')
+
+        response = client.get(
+            '/api/v1/titles/', {'ordering': '-review_count'}
+        )
+        results = response.json()['results']
+        assert [title['id'] for title in results[:2]] == [second, first], (
+            'Проверьте сортировку произведений `?ordering=-review_count`.'
+        )
+        assert results[0]['review_count'] == 2
+
+        response = client.get(
+            f'/api/v1/titles/{second}/reviews/',
+            {'ordering': '-comment_count'},
+        )
+        assert [review['id'] for review in response.json()['results']] == (
+            review_ids
+        ), 'Проверьте сортировку отзывов `?ordering=-comment_count`.'
+
+        for url, ordering in (
+            ('/api/v1/titles/', '-review_count'),
+            (f'/api/v1/titles/{second}/reviews/', '-comment_count'),
+        ):
+            response = client.get(url, {'ordering': ordering, 'cursor': ''})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{url}?ordering={ordering}&cursor=` '
+                'возвращает 400, а не страницы в порядке id.'
+            )
+            assert 'ordering' in response.json()
+
+    def test_03_known_count(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 5
+        ).json()['id']
+        create_single_comment(admin_client, title_id, review_id, 'Да')
+        Title.objects.filter(id=title_id).update(review_count=7)
+        Review.objects.filter(id=review_id).update(comment_count=9)
+        cache.clear()
+
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        assert client.get(url).json()['count'] == 7, (
+            'Проверьте, что количество отзывов берётся из `review_count` '
+            'произведения, а не из COUNT(*).'
+        )
+        response = client.get(f'{url}{review_id}/comments/')
+        assert response.json()['count'] == 9, (
+            'Проверьте, что количество комментариев берётся из '
+            '`comment_count` отзыва.'
+        )
+
+    def test_04_rebuild_command(self, admin_client, user_client,
+                                moderator_client, user, moderator):
+        _, reviews, titles = create_comments(admin_client, {
+            user: user_client, moderator: moderator_client
+        })
+        Title.objects.update(review_count=0)
+        Review.objects.update(comment_count=5)
+        stdout = StringIO()
+        with pytest.raises(CommandError):
+            call_command('rebuild_title_aggregates', '--check',
+                         stdout=stdout)
+        assert f'Review {reviews[1]["id"]}: comment_count: 5 -> 0' in (
+            stdout.getvalue()
+        ), 'Проверьте, что `--check` показывает расхождения счётчиков.'
+
+        call_command('rebuild_title_aggregates', '--chunk-size', '1',
+                     stdout=StringIO())
+        assert Title.objects.get(id=titles[0]['id']).review_count == 2
+        assert counts(Review, 'comment_count') == {
+            reviews[0]['id']: Comment.objects.count(), reviews[1]['id']: 0
+        }, (
+            'Проверьте, что команда `rebuild_title_aggregates` '
+            'пересчитывает счётчики отзывов и комментариев.'
+        )
+        call_command('rebuild_title_aggregates', '--check',
+                     stdout=StringIO())
@@ -0,0 +1,149 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from reviews.generations import get_generations
+from reviews.models import Genre, GenreTitle, Review, Title
+from users.models import User
+
+from tests.utils import (create_categories, create_genre,
+                         create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ResponseCache:
+    url = '/api/v1/titles/'
+    stats_url = '/api/v1/cache/stats/'
+
+    def test_01_hit(self, client, admin_client, django_assert_num_queries):
+        create_titles(admin_client)
+        params = {'year': 1999, 'ordering': 'id'}
+        response = client.get(self.url, params)
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(1, info=(
+            'Проверьте, что повторный запрос без токена отдаётся из кэша '
+            'ответов: из базы читаются только поколения моделей.'
+        )):
+            cached = client.get(f'{self.url}?ordering=id&year=1999')
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что ключ кэша не зависит от порядка параметров.'
+        )
+        assert cached.status_code == HTTPStatus.OK
+        assert cached['Content-Type'] == response['Content-Type']
+        assert cached.content == response.content
+
+        assert client.get(self.url, {'year': 2000})['X-Cache'] == 'MISS'
+        response = admin_client.get(self.stats_url)
+        assert response.json() == {'hits': 1, 'misses': 2}, (
+            f'Проверьте, что `{self.stats_url}` возвращает счётчики '
+            'попаданий и промахов кэша.'
+        )
+        assert client.get(self.stats_url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_02_not_cached(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        for _ in range(2):
+            response = user_client.get(self.url)
+            assert 'X-Cache' not in response, (
+                'Проверьте, что ответы на запросы с токеном не кэшируются.'
+            )
+            response = client.get(f'{self.url}{titles[-1]["id"] + 1}/')
+            assert response.status_code == HTTPStatus.NOT_FOUND
+            assert response['X-Cache'] == 'MISS', (
+                'Проверьте, что кэшируются только успешные ответы.'
+            )
+        response = client.get(self.url, HTTP_ACCEPT='text/html')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает заголовок Accept.'
+        )
+
+    def test_03_invalidated_by_writes(self, client, admin_client,
+                                      user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'{self.url}{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        client.get(title_url)
+        client.get(reviews_url)
+
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 8
+        ).json()
+        response = client.get(title_url)
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+        assert client.get(reviews_url).json()['count'] == 1
+
+        client.get(reviews_url)
+        create_single_comment(
+            admin_client, titles[0]['id'], review['id'], 'Комментарий'
+        )
+        response = client.get(f'{reviews_url}{review["id"]}/')
+        assert response.json()['comment_count'] == 1, (
+            'Проверьте, что новый комментарий сбрасывает кэш отзывов.'
+        )
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(f'{reviews_url}{review["id"]}/')
+        assert response.json()['author'] == 'renamed', (
+            'Проверьте, что изменение пользователя сбрасывает кэш отзывов.'
+        )
+
+    def test_04_categories_and_genres(self, client, admin_client):
+        categories = create_categories(admin_client)
+        genres = create_genre(admin_client)
+        assert client.get('/api/v1/categories/').json()['count'] == 2
+        assert client.get('/api/v1/genres/').json()['count'] == 3
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        assert client.get('/api/v1/categories/').json()['count'] == 1, (
+            'Проверьте, что удаление категории сбрасывает кэш категорий.'
+        )
+        assert client.get('/api/v1/genres/').json()['count'] == 2
+
+    def test_05_other_process(self, client, admin_client, user_client,
+                              monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'{self.url}{titles[0]["id"]}/'
+        # Второй процесс сервера со своим кэшем в памяти.
+        other = LocMemCache('other-process', {})
+        other.clear()
+        monkeypatch.setattr('api.middleware.cache', other)
+        client.get(title_url)
+        assert client.get(title_url)['X-Cache'] == 'HIT'
+        monkeypatch.undo()
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        monkeypatch.setattr('api.middleware.cache', other)
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что запись, обработанная одним процессом, сбрасывает '
+            'кэш ответов остальных процессов.'
+        )
+        assert response.json()['rating'] == 8
+
+    def test_06_narrow_invalidation(self, admin_client, user_client, user):
+        titles, _, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        models = (User, Review, Title, GenreTitle, Genre)
+        before = get_generations(models)
+        user_client.patch('/api/v1/users/me/', data={'bio': 'Биография'})
+        user.refresh_from_db()
+        user.save(update_fields=['last_login'])
+        assert get_generations(models) == before, (
+            'Проверьте, что изменение пользователя без смены имени не '
+            'сбрасывает кэш.'
+        )
+
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        after = get_generations(models)
+        changed = {
+            model for model, old, new in zip(models, before, after)
+            if old != new
+        }
+        assert changed == {Genre, GenreTitle}, (
+            'Проверьте, что удаление жанра сбрасывает поколения только '
+            'жанров и связей жанров с произведениями.'
+        )
@@ -0,0 +1,146 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
+from django.utils.http import http_date
+from reviews.models import ModelGeneration, Review, Title
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+def backdate_writes(seconds):
+    """Сдвигает время последних записей во все модели в прошлое."""
+    ModelGeneration.objects.update(
+        modified=F('modified') - timedelta(seconds=seconds)
+    )
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ConditionalGet:
+    url = '/api/v1/titles/'
+
+    def test_01_etag(self, client, admin_client, user_client,
+                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.url}{titles[0]["id"]}/'
+        response = client.get(detail_url)
+        etag = response['ETag']
+        assert etag.startswith('"') and etag.endswith('"'), (
+            'Проверьте, что ответ содержит строгий заголовок ETag.'
+        )
+        with django_assert_num_queries(1, info=(
+            'Проверьте, что на условный запрос с совпадающим ETag ответ '
+            '304 отдаётся по поколениям моделей, без других запросов.'
+        )):
+            response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+
+        assert client.get(
+            self.url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что у разных адресов разные ETag.'
+        )
+        assert user_client.get(detail_url)['ETag'] != etag
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после записи прежний ETag не совпадает.'
+        )
+        assert response.json()['rating'] == 7
+        assert response['ETag'] != etag
+
+        admin_client.delete(detail_url)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_last_modified(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'{self.url}{titles[0]["id"]}/reviews/'
+        backdate_writes(10)
+        response = client.get(reviews_url)
+        last_modified = response['Last-Modified']
+        assert last_modified, (
+            'Проверьте, что ответ содержит заголовок Last-Modified.'
+        )
+        response = client.get(
+            reviews_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на If-Modified-Since без изменений '
+            'возвращается 304.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(
+            reviews_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после записи If-Modified-Since не даёт 304.'
+        )
+        assert 'Last-Modified' not in response, (
+            'Проверьте, что Last-Modified не отдаётся в секунду записи: '
+            'следующая запись в ту же секунду его бы не изменила.'
+        )
+        response = client.get(
+            reviews_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_updated_at(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        review_id = create_single_review(
+            user_client, title.id, 'Отзыв', 7
+        ).json()['id']
+        assert Title.objects.get(id=title.id).updated_at > title.updated_at, (
+            'Проверьте, что новый отзыв обновляет `updated_at` '
+            'произведения.'
+        )
+        review = Review.objects.get(id=review_id)
+        create_single_comment(admin_client, title.id, review_id, 'Да')
+        assert Review.objects.get(id=review_id).updated_at > (
+            review.updated_at
+        ), 'Проверьте, что новый комментарий обновляет `updated_at` отзыва.'
+
+    def test_04_other_process(self, client, admin_client, user_client,
+                              monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.url}{titles[0]["id"]}/'
+        backdate_writes(10)
+        response = client.get(detail_url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        # Второй процесс сервера со своим кэшем в памяти.
+        other = LocMemCache('other-process', {})
+        other.clear()
+        monkeypatch.setattr('api.middleware.cache', other)
+        response = client.get(
+            detail_url, HTTP_IF_NONE_MATCH=etag,
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag одинаков во всех процессах сервера.'
+        )
+        assert response['Last-Modified'] == last_modified, (
+            'Проверьте, что Last-Modified берётся из времени последней '
+            'записи, а не из времени запуска процесса.'
+        )
+        monkeypatch.undo()
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        monkeypatch.setattr('api.middleware.cache', other)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись, обработанная одним процессом, меняет '
+            'ETag в остальных.'
+        )
+        assert response.json()['rating'] == 7